@@ -0,0 +1,86 @@
+"""
+Micro-benchmark: deserializer biên dịch (util.compile_deserializer) so với
+đường reflective cũ (duyệt openapi_types + _deserialize cho từng trường mỗi lần gọi).
+
+Chạy từ thư mục Week11:
+    python -m benchmarks.bench_deserialize [--items 10000] [--repeat 5]
+"""
+import argparse
+import datetime
+import timeit
+from typing import List
+
+from openapi_server import typing_utils, util
+from openapi_server.models.product import Product
+from openapi_server.models.product_input import ProductInput
+
+
+# --- Đường cũ, giữ nguyên để so sánh ---
+
+def _reflective(data, klass):
+    if data is None:
+        return None
+    if klass in (int, float, str, bool, bytearray):
+        return util._deserialize_primitive(data, klass)
+    elif klass == object:
+        return data
+    elif klass == datetime.date:
+        return util.deserialize_date(data)
+    elif klass == datetime.datetime:
+        return util.deserialize_datetime(data)
+    elif typing_utils.is_generic(klass):
+        if typing_utils.is_list(klass):
+            return [_reflective(sub_data, klass.__args__[0]) for sub_data in data]
+        if typing_utils.is_dict(klass):
+            return {k: _reflective(v, klass.__args__[1]) for k, v in data.items()}
+    else:
+        return _reflective_model(data, klass)
+
+
+def _reflective_model(data, klass):
+    instance = klass()
+    if not instance.openapi_types:
+        return data
+    for attr, attr_type in instance.openapi_types.items():
+        if data is not None \
+                and instance.attribute_map[attr] in data \
+                and isinstance(data, (list, dict)):
+            value = data[instance.attribute_map[attr]]
+            setattr(instance, attr, _reflective(value, attr_type))
+    return instance
+
+
+def _payload(items):
+    return [{'name': f'Sản phẩm {i}', 'price': i * 1.5, 'description': 'Mô tả ' * 5}
+            for i in range(items)]
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--items', type=int, default=10000)
+    parser.add_argument('--repeat', type=int, default=5)
+    args = parser.parse_args(argv)
+
+    payload = _payload(args.items)
+    klass = List[ProductInput]
+    compiled = util.compile_deserializer(klass)
+    assert [m.to_dict() for m in compiled(payload)] == [m.to_dict() for m in _reflective(payload, klass)]
+
+    cases = [
+        ('reflective List[ProductInput]', lambda: _reflective(payload, klass)),
+        ('compiled   List[ProductInput]', lambda: compiled(payload)),
+        ('reflective Product.from_dict x N', lambda: [_reflective_model(d, Product) for d in payload]),
+        ('compiled   Product.from_dict x N', lambda: [Product.from_dict(d) for d in payload]),
+    ]
+    print(f'{args.items} items, best of {args.repeat}')
+    results = {}
+    for name, fn in cases:
+        best = min(timeit.repeat(fn, number=1, repeat=args.repeat))
+        results[name] = best
+        print(f'  {name:36s} {best * 1000:8.1f} ms  ({best / args.items * 1e6:.2f} us/item)')
+    speedup = results['reflective List[ProductInput]'] / results['compiled   List[ProductInput]']
+    print(f'  speedup (list): {speedup:.2f}x')
+
+
+if __name__ == '__main__':
+    main()
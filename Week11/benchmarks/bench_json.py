@@ -0,0 +1,58 @@
+"""
+Micro-benchmark: serialise response của list endpoint.
+So sánh Jsonifier mặc định của connexion (flask.json, indent=2, JSONEncoder cũ)
+với FastJsonifier (orjson nếu có, và json stdlib không indent).
+
+Chạy từ thư mục Week11:
+    python -m benchmarks.bench_json [--items 10000] [--repeat 5]
+"""
+import argparse
+import datetime
+import json
+import timeit
+
+import flask
+from bson import ObjectId
+from connexion.jsonifier import Jsonifier
+
+from openapi_server import encoder
+
+
+def _page(items):
+    now = datetime.datetime(2024, 1, 2, 3, 4, 5)
+    return {
+        'items': [{'id': str(ObjectId()), 'name': f'Sản phẩm {i}', 'price': i * 1.5,
+                   'description': 'Mô tả ngắn', 'created_at': now}
+                  for i in range(items)],
+        'next': '/api/v1/products?limit=50&after=abc',
+    }
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--items', type=int, default=10000)
+    parser.add_argument('--repeat', type=int, default=5)
+    args = parser.parse_args(argv)
+
+    page = _page(args.items)
+    app = flask.Flask(__name__)
+    app.json_encoder = encoder.JSONEncoder
+
+    cases = [('connexion default (flask.json, indent=2)', Jsonifier(flask.json, indent=2))]
+    if encoder.orjson is not None:
+        cases.append(('FastJsonifier orjson', encoder.FastJsonifier('orjson')))
+    cases.append(('FastJsonifier stdlib', encoder.FastJsonifier('stdlib')))
+
+    with app.app_context():
+        expected = json.loads(cases[0][1].dumps(page))
+        print(f'{args.items} items, best of {args.repeat}')
+        baseline = None
+        for name, jsonifier in cases:
+            assert json.loads(jsonifier.dumps(page)) == expected
+            best = min(timeit.repeat(lambda: jsonifier.dumps(page), number=1, repeat=args.repeat))
+            baseline = baseline or best
+            print(f'  {name:42s} {best * 1000:8.2f} ms  ({baseline / best:5.1f}x)')
+
+
+if __name__ == '__main__':
+    main()
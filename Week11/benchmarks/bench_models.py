@@ -0,0 +1,111 @@
+"""
+Micro-benchmark: model slotted (type map ở mức class) so với dạng generate cũ
+(mỗi __init__ tạo openapi_types/attribute_map mới, instance có __dict__,
+to_dict dùng map/lambda).
+
+Chạy từ thư mục Week11:
+    python -m benchmarks.bench_models [--items 10000] [--repeat 5]
+"""
+import argparse
+import timeit
+import tracemalloc
+
+from openapi_server.models.product import Product
+
+
+# --- Dạng cũ, giữ nguyên để so sánh ---
+
+class _LegacyModel:
+    openapi_types = {}
+    attribute_map = {}
+
+    def to_dict(self):
+        result = {}
+        for attr in self.openapi_types:
+            value = getattr(self, attr)
+            if isinstance(value, list):
+                result[attr] = list(map(
+                    lambda x: x.to_dict() if hasattr(x, "to_dict") else x,
+                    value
+                ))
+            elif hasattr(value, "to_dict"):
+                result[attr] = value.to_dict()
+            elif isinstance(value, dict):
+                result[attr] = dict(map(
+                    lambda item: (item[0], item[1].to_dict())
+                    if hasattr(item[1], "to_dict") else item,
+                    value.items()
+                ))
+            else:
+                result[attr] = value
+        return result
+
+    def __eq__(self, other):
+        return self.__dict__ == other.__dict__
+
+
+class _LegacyProduct(_LegacyModel):
+    def __init__(self, id=None, name=None, price=None, description=None, created_at=None):
+        self.openapi_types = {
+            'id': str,
+            'name': str,
+            'price': float,
+            'description': str,
+            'created_at': object
+        }
+        self.attribute_map = {
+            'id': 'id',
+            'name': 'name',
+            'price': 'price',
+            'description': 'description',
+            'created_at': 'createdAt'
+        }
+        self._id = id
+        self._name = name
+        self._price = price
+        self._description = description
+        self._created_at = created_at
+
+    id = property(lambda self: self._id)
+    name = property(lambda self: self._name)
+    price = property(lambda self: self._price)
+    description = property(lambda self: self._description)
+    created_at = property(lambda self: self._created_at)
+
+
+def _build(klass, items):
+    return [klass(id=str(i), name=f'Sản phẩm {i}', price=i * 1.5, description='Mô tả')
+            for i in range(items)]
+
+
+def _memory(klass, items):
+    tracemalloc.start()
+    before = tracemalloc.take_snapshot()
+    models = _build(klass, items)
+    after = tracemalloc.take_snapshot()
+    tracemalloc.stop()
+    size = sum(stat.size_diff for stat in after.compare_to(before, 'filename'))
+    del models
+    return size / items
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--items', type=int, default=10000)
+    parser.add_argument('--repeat', type=int, default=9)
+    args = parser.parse_args(argv)
+
+    legacy, slotted = _build(_LegacyProduct, args.items), _build(Product, args.items)
+    assert [m.to_dict() for m in legacy] == [m.to_dict() for m in slotted]
+
+    print(f'{args.items} items, best of {args.repeat}')
+    for label, klass, models in (('legacy ', _LegacyProduct, legacy), ('slotted', Product, slotted)):
+        construct = min(timeit.repeat(lambda: _build(klass, args.items), number=1, repeat=args.repeat))
+        to_dict = min(timeit.repeat(lambda: [m.to_dict() for m in models], number=1, repeat=args.repeat))
+        equal = min(timeit.repeat(lambda: [a == b for a, b in zip(models, models)], number=1, repeat=args.repeat))
+        print(f'  {label}  construct {construct * 1000:7.1f} ms  to_dict {to_dict * 1000:7.1f} ms  '
+              f'__eq__ {equal * 1000:6.1f} ms  memory {_memory(klass, args.items):6.0f} B/instance')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,53 @@
+"""
+Micro-benchmark: đường đọc danh sách sản phẩm, không cần MongoDB.
+So sánh dựng Document (Product._from_son + to_dict, như QuerySet MongoEngine mặc định)
+với map document thô (as_pymongo) sang dạng response bằng product_reads.to_items.
+
+Chạy từ thư mục Week11:
+    python -m benchmarks.bench_read_path [--sizes 1000 10000 100000] [--repeat 3]
+"""
+import argparse
+import datetime
+import timeit
+
+from bson import SON, ObjectId
+
+from openapi_server.db_models import Product as DbProduct
+from openapi_server.services.product_reads import to_items
+
+
+def _hydrated_docs(count):
+    # Dạng cũ: exclude('name_grams'), các trường còn lại đều được đọc
+    now = datetime.datetime(2024, 1, 2, 3, 4, 5)
+    return [SON([('_id', ObjectId()), ('name', f'Sản phẩm {i}'), ('price', i * 1.5),
+                 ('description', 'Mô tả ngắn'), ('version', 1), ('created_at', now)])
+            for i in range(count)]
+
+
+def _projected_docs(docs):
+    # Dạng mới: only(name, price, description) + _id
+    return [SON([('_id', d['_id']), ('name', d['name']), ('price', d['price']),
+                 ('description', d['description'])]) for d in docs]
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--sizes', type=int, nargs='+', default=[1000, 10000, 100000])
+    parser.add_argument('--repeat', type=int, default=3)
+    args = parser.parse_args(argv)
+
+    print(f'best of {args.repeat}')
+    for size in args.sizes:
+        hydrated = _hydrated_docs(size)
+        projected = _projected_docs(hydrated)
+        assert [DbProduct._from_son(d).to_dict() for d in hydrated] == to_items(projected)
+
+        old = min(timeit.repeat(lambda: [DbProduct._from_son(d).to_dict() for d in hydrated],
+                                number=1, repeat=args.repeat))
+        new = min(timeit.repeat(lambda: to_items(projected), number=1, repeat=args.repeat))
+        print(f'  {size:>7} rows  Document+to_dict {old * 1000:9.1f} ms ({size / old:>10,.0f} rows/s)'
+              f'  raw {new * 1000:8.1f} ms ({size / new:>12,.0f} rows/s)  {old / new:5.1f}x')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,52 @@
+"""
+Micro-benchmark: validate requestBody hợp lệ.
+So sánh RequestBodyValidator mặc định của connexion (Draft4RequestValidator)
+với CompiledRequestBodyValidator (hàm kiểm tra biên dịch sẵn từ schema).
+
+Chạy từ thư mục Week11:
+    python -m benchmarks.bench_validation [--number 20000] [--repeat 5]
+"""
+import argparse
+import timeit
+
+from connexion.decorators.validation import RequestBodyValidator
+from connexion.json_schema import resolve_refs
+
+from openapi_server.schemas import load_spec
+from openapi_server.validation import CompiledRequestBodyValidator
+
+
+def _cases():
+    schemas = resolve_refs(load_spec())['components']['schemas']
+    product = {'name': 'Laptop', 'price': 1299.99, 'description': 'Một chiếc laptop mạnh mẽ'}
+    batch = {'operations': [{'op': 'update', 'id': f'{i:024x}', 'version': 1, 'data': product}
+                            for i in range(100)]}
+    return [
+        ('ProductInput', schemas['ProductInput'], product, 1),
+        ('BatchRequest (100 ops)', schemas['BatchRequest'], batch, 100),
+    ]
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--number', type=int, default=20000)
+    parser.add_argument('--repeat', type=int, default=5)
+    args = parser.parse_args(argv)
+
+    for title, schema, payload, scale in _cases():
+        number = max(args.number // scale, 1)
+        print(f'{title}: {number} lần, best of {args.repeat}')
+        baseline = None
+        for name, cls in (('connexion default (jsonschema)', RequestBodyValidator),
+                          ('CompiledRequestBodyValidator', CompiledRequestBodyValidator)):
+            validator = cls(schema, ['application/json'], None)
+            assert validator.validate_schema(payload, 'bench') is None
+            best = min(timeit.repeat(lambda: validator.validate_schema(payload, 'bench'),
+                                     number=number, repeat=args.repeat))
+            per_call = best / number * 1e6
+            baseline = baseline or per_call
+            print(f'  {name:34s} {per_call:9.2f} µs/request  ({baseline / per_call:6.1f}x)')
+
+
+if __name__ == '__main__':
+    main()
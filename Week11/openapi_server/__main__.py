@@ -3,10 +3,18 @@
 import connexion
 import logging
 import os
+import threading
 from mongoengine import connect
 from openapi_server import encoder
+from openapi_server.validation import CompiledRequestBodyValidator
 from prometheus_flask_exporter import PrometheusMetrics
 from openapi_server.controllers.extensions import limiter
+from openapi_server.db_models import Product as DbProduct
+from openapi_server.services.webhook_service import dispatcher, relay, http_client, delivery, coalescer
+from openapi_server.services.product_search import backfill_name_grams, search_cache
+from openapi_server.services.name_index import name_index
+from openapi_server.services.product_cache import product_cache
+from openapi_server.services.index_manager import sync_indexes
 
 # --- PHẦN CẤU HÌNH GLOBAL (Chạy ngay khi Gunicorn import file này) ---
 
@@ -31,10 +39,12 @@ except Exception as e:
 
 # 3. Khởi tạo App Connexion
 app = connexion.App(__name__, specification_dir='./openapi/')
-app.app.json_encoder = encoder.JSONEncoder
+encoder.install(app) # JSON response qua orjson nếu có, không thì json stdlib (không indent)
 app.add_api('openapi.yaml',
             arguments={'title': 'Product API'},
-            pythonic_params=True)
+            pythonic_params=True,
+            # requestBody validate bằng hàm biên dịch sẵn từ schema, lỗi vẫn do jsonschema báo
+            validator_map={'body': CompiledRequestBodyValidator})
 
 # 4. Kích hoạt Monitoring & Rate Limit
 # (Phải gắn vào flask_app TẠI ĐÂY thì Gunicorn mới nhận được)
@@ -42,9 +52,30 @@ flask_app = app.app
 
 metrics = PrometheusMetrics(flask_app)
 metrics.info('app_info', 'Product API Info', version='1.0.0')
+dispatcher.init_metrics(metrics) # Độ sâu hàng đợi & mức sử dụng worker webhook
+http_client.init_metrics(metrics) # Pool hit/miss & thời gian connect khi gửi webhook
+delivery.init_metrics(metrics) # Retry, circuit breaker & dead letter
+coalescer.init_metrics(metrics) # Số sự kiện webhook được gộp
+search_cache.init_metrics(metrics) # Hit/miss/eviction của cache tìm kiếm
+name_index.init_metrics(metrics) # Kích thước index gợi ý tên
+product_cache.init_metrics(metrics) # Hit ratio & số request được gộp của cache product
 
 limiter.init_app(flask_app)
 
+# 5. Relay outbox: phát lại các sự kiện còn tồn (kể cả từ lần chạy trước)
+relay.start()
+
+# 6. Đồng bộ index MongoDB (idempotent) và báo cáo index thiếu/không dùng (chạy nền)
+#    CLI tương đương: python -m openapi_server.services.index_manager
+threading.Thread(target=sync_indexes, name='index-sync', daemon=True).start()
+
+# 7. Tính name_grams và version cho dữ liệu cũ (chạy nền, không chặn worker khởi động)
+threading.Thread(target=backfill_name_grams, name='name-grams-backfill', daemon=True).start()
+threading.Thread(target=DbProduct.backfill_versions, name='version-backfill', daemon=True).start()
+
+# 8. Nạp index gợi ý tên sản phẩm cho /products/suggest (chạy nền)
+name_index.warm()
+
 
 def main():
     # Hàm này chỉ chạy khi bạn gõ lệnh: python -m openapi_server
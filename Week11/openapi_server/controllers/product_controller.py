@@ -1,16 +1,51 @@
 # product_controller.py
+import os
+import io
+import json
 import connexion
 import logging
+from urllib.parse import urlencode
+from flask import Response, stream_with_context
+from bson import ObjectId
 from openapi_server.models.product import Product as ApiProduct
 from openapi_server.db_models import Product as DbProduct
+from mongoengine import Q
 from mongoengine.errors import DoesNotExist, ValidationError
-from openapi_server.services.webhook_service import trigger_event # Import Service mới
+from pymongo import InsertOne, UpdateOne, DeleteOne
+from pymongo.errors import BulkWriteError
+from openapi_server.services.webhook_service import trigger_event, trigger_events # Import Service mới
 # Import limiter từ extensions để dùng decorator
 from openapi_server.controllers.extensions import limiter
+from openapi_server.services.pagination import encode_cursor, decode_cursor
+from openapi_server.schemas import schema_validator, first_error
+from openapi_server.services.product_search import search_page, search_cache
+from openapi_server.services.product_hooks import product_changed
+from openapi_server.services.name_index import name_index
+from openapi_server.services.product_cache import product_cache
+from openapi_server.services import product_reads
 
 # Khởi tạo logger cho file này
 logger = logging.getLogger(__name__)
 
+# Phân trang: kích thước trang mặc định và tối đa server cho phép
+DEFAULT_PAGE_SIZE = 50
+MAX_PAGE_SIZE = int(os.getenv('PRODUCTS_MAX_PAGE_SIZE', '200'))
+
+# Multi-get: số id tối đa trong một request GET /products?ids=
+MAX_MULTI_GET = int(os.getenv('PRODUCTS_MAX_MULTI_GET', '100'))
+
+# Export: số document Mongo trả về mỗi lần getMore / số dòng gộp vào một chunk HTTP
+EXPORT_BATCH_SIZE = int(os.getenv('PRODUCTS_EXPORT_BATCH_SIZE', '1000'))
+EXPORT_CHUNK_SIZE = 100
+
+# Import: số document mỗi lần insert_many, và số lỗi tối đa trả về trong báo cáo
+IMPORT_BATCH_SIZE = int(os.getenv('PRODUCTS_IMPORT_BATCH_SIZE', '500'))
+MAX_IMPORT_ERRORS = 1000
+
+# Batch: số thao tác tối đa mỗi request, và hạn mức tính theo số thao tác (không theo số request)
+BATCH_MAX_OPS = int(os.getenv('PRODUCTS_BATCH_MAX_OPS', '1000'))
+BATCH_RATE_LIMIT = os.getenv('PRODUCTS_BATCH_RATE_LIMIT', '5000 per minute')
+
 # --- APPLICATON ---
 # --- 1. Pattern CQRS: Advanced Search ---
 @limiter.limit("20 per minute")
@@ -24,24 +59,33 @@ def search_products():
         
     criteria = connexion.request.get_json()
     
-    # Xây dựng Query động với MongoEngine
-    query = DbProduct.objects
-    
-    if 'name_contains' in criteria:
-        # Tìm kiếm không phân biệt hoa thường (icontains)
-        query = query.filter(name__icontains=criteria['name_contains'])
-        
-    if 'min_price' in criteria:
-        # Giá lớn hơn hoặc bằng (gte)
-        query = query.filter(price__gte=criteria['min_price'])
-        
-    if 'max_price' in criteria:
-        # Giá nhỏ hơn hoặc bằng (lte)
-        query = query.filter(price__lte=criteria['max_price'])
+    # Các storefront gửi lặp lại cùng một criteria: trả từ cache nếu có
+    cache_key = search_cache.key(criteria)
+    cached = search_cache.get(cache_key)
+    if cached is not None:
+        return cached, 200
+
+    # Generation trước khi đọc Mongo: có product bị ghi trong lúc tìm kiếm thì không cache kết quả
+    generation = search_cache.generation()
+
+    # Chọn access path (index n-gram / index price / index sort), sort + phân trang keyset
+    try:
+        items, next_after, access_path = search_page(criteria)
+    except ValueError:
+        return {'message': 'Cursor after không hợp lệ'}, 400
+    logger.info(f"Tìm kiếm sản phẩm qua access path: {access_path}")
 
-    # Thực thi query
-    results = [p.to_dict() for p in query]
-    return results, 200
+    result = {'items': items, 'next_after': next_after}
+    search_cache.put(cache_key, result, generation)
+    return result, 200
+
+@limiter.limit("300 per minute")  # Autocomplete gọi theo từng phím gõ
+def suggest_products(prefix, limit=10):
+    """Gợi ý tên sản phẩm theo tiền tố, trả từ index trong bộ nhớ (không truy vấn Mongo)"""
+    try:
+        return name_index.suggest(prefix, limit), 200
+    except ValueError as e:
+        return {'message': str(e)}, 400
 
 @limiter.limit("5 per minute")  # Rate limit: Chỉ cho phép tạo 5 sản phẩm/phút từ 1 IP
 def create_product():
@@ -60,7 +104,8 @@ def create_product():
             
             logger.info(f"Đã tạo sản phẩm thành công: ID={new_product.id}") # Log thành công
             trigger_event('product.created', new_product.to_dict()) # Gọi Service để gửi thông báo
-            return new_product.to_dict(), 201
+            product_changed('product.created', [new_product.to_dict()]) # Báo cache/index trong process
+            return new_product.to_dict(), 201, {'ETag': new_product.etag}
             
         except ValidationError as e:
             logger.warning(f"Lỗi Validate dữ liệu: {str(e)}") # Log Warning
@@ -72,25 +117,394 @@ def create_product():
     logger.warning("Request body không phải JSON")
     return 'Invalid input', 400
 
-@limiter.limit("2 per minute") # Cho phép xem danh sách 20 lần/phút
-def get_all_products():
-    """Lấy danh sách tất cả sản phẩm"""
+def _list_rate_limit():
+    # Multi-get (?ids=) thay cho N lần gọi GET /products/{id}: hạn mức theo request cao hơn
+    if connexion.request.args.get('ids'):
+        return "30 per minute"
+    return "2 per minute"
+
+def _get_many(ids):
+    """Lấy nhiều sản phẩm bằng một truy vấn $in, trả về theo đúng thứ tự id trong request"""
+    found = product_reads.get_many(ids)
+
+    items = []
+    for product_id in ids:
+        product = found.get(product_id)
+        if product is None:
+            items.append({'id': product_id, 'status': 'not_found', 'product': None})
+        else:
+            items.append({'id': product_id, 'status': 'found', 'product': product})
+    logger.info(f"Multi-get {len(ids)} id, tìm thấy {len(found)} sản phẩm")
+    return {'items': items}, 200
+
+@limiter.limit(_list_rate_limit) # Cho phép xem danh sách 20 lần/phút
+def get_all_products(limit=DEFAULT_PAGE_SIZE, after=None, unpaginated=False, ids=None):
+    """
+    Lấy danh sách sản phẩm, phân trang keyset theo _id.
+    `after` là cursor opaque lấy từ link `next` của trang trước.
+    `ids` (danh sách id cách nhau bởi dấu phẩy) chuyển sang chế độ multi-get.
+    """
     try:
-        all_products = DbProduct.objects.all()
-        results = [product.to_dict() for product in all_products]
-        
-        logger.info(f"Đã lấy danh sách {len(results)} sản phẩm")
-        return results, 200
+        if ids:
+            if len(ids) > MAX_MULTI_GET:
+                return {'message': f'Tối đa {MAX_MULTI_GET} id mỗi request'}, 400
+            return _get_many(ids)
+
+        if unpaginated:
+            # Dạng cũ: trả về toàn bộ collection (chỉ khi client yêu cầu rõ ràng)
+            results = product_reads.list_all()
+            logger.info(f"Đã lấy danh sách {len(results)} sản phẩm (không phân trang)")
+            return results, 200
+
+        after_id = None
+        if after:
+            try:
+                (after_id,) = decode_cursor(after, 1)
+            except ValueError:
+                after_id = None
+            if not ObjectId.is_valid(after_id):
+                return {'message': 'Cursor after không hợp lệ'}, 400
+
+        limit = min(limit, MAX_PAGE_SIZE)
+        # Đọc document thô (không dựng Document), lấy dư 1 bản ghi để biết còn trang sau
+        results, has_more = product_reads.list_page(limit, after_id)
+        next_link = None
+        if has_more:
+            cursor = encode_cursor([results[-1]['id']])
+            next_link = f"{connexion.request.path}?{urlencode({'limit': limit, 'after': cursor})}"
+
+        logger.info(f"Đã lấy trang {len(results)} sản phẩm")
+        return {'items': results, 'next': next_link}, 200
     except Exception as e:
         logger.error(f"Lỗi khi lấy danh sách sản phẩm: {str(e)}", exc_info=True)
         return {'message': str(e)}, 500
 
+@limiter.limit("10 per minute")
+def export_products(format_='ndjson'):
+    """
+    Xuất toàn bộ catalogue dạng stream (NDJSON hoặc mảng JSON).
+    Đọc document thô từ cursor Mongo và ghi dần ra response (chunked),
+    nên bộ nhớ worker không tăng theo kích thước catalogue.
+    """
+    cursor = (DbProduct.objects
+              .order_by('id')
+              .only('name', 'price', 'description')
+              .as_pymongo()
+              .batch_size(EXPORT_BATCH_SIZE))
+
+    def _lines():
+        chunk = []
+        for doc in cursor:
+            chunk.append(json.dumps(DbProduct.raw_to_dict(doc), ensure_ascii=False))
+            if len(chunk) >= EXPORT_CHUNK_SIZE:
+                yield chunk
+                chunk = []
+        if chunk:
+            yield chunk
+
+    def generate_ndjson():
+        for chunk in _lines():
+            yield '\n'.join(chunk) + '\n'
+
+    def generate_json_array():
+        yield '['
+        separator = ''
+        for chunk in _lines():
+            yield separator + ','.join(chunk)
+            separator = ','
+        yield ']'
+
+    def guarded(generator):
+        # Lỗi giữa chừng không đổi được status code nữa, chỉ có thể log và dừng stream
+        try:
+            yield from generator
+        except Exception as e:
+            logger.error(f"Lỗi khi export sản phẩm: {str(e)}", exc_info=True)
+
+    if format_ == 'json':
+        body, mimetype = generate_json_array(), 'application/json'
+    else:
+        body, mimetype = generate_ndjson(), 'application/x-ndjson'
+
+    logger.info(f"Bắt đầu export sản phẩm (format={format_})")
+    return Response(stream_with_context(guarded(body)), mimetype=mimetype)
+
+def _write_import_batch(batch, report):
+    """insert_many không thứ tự cho một lô [(số dòng, document)], ghi lỗi theo dòng"""
+    docs = [doc for _, doc in batch]
+    failed = {}
+    try:
+        DbProduct._get_collection().insert_many(docs, ordered=False)
+    except BulkWriteError as e:
+        for error in e.details.get('writeErrors', []):
+            failed[error['index']] = error.get('errmsg', 'Lỗi ghi dữ liệu')
+
+    items = []
+    for index, (line_no, doc) in enumerate(batch):
+        if index in failed:
+            _import_error(report, line_no, failed[index])
+        else:
+            items.append(DbProduct.raw_to_dict(doc))
+    report['imported'] += len(items)
+
+    # Một sự kiện tổng hợp cho cả lô thay vì một sự kiện cho mỗi sản phẩm
+    if items:
+        trigger_event('product.imported', {'count': len(items), 'items': items})
+        product_changed('product.created', items)
+
+def _import_error(report, line_no, message):
+    report['failed'] += 1
+    if len(report['errors']) < MAX_IMPORT_ERRORS:
+        report['errors'].append({'line': line_no, 'message': message})
+
+@limiter.limit("10 per minute")
+def import_products(batch_size=IMPORT_BATCH_SIZE):
+    """
+    Import sản phẩm từ body NDJSON (mỗi dòng một ProductInput).
+    Từng dòng được parse và validate lần lượt, ghi xuống Mongo theo lô insert_many;
+    dòng lỗi không chặn các dòng khác và được liệt kê trong báo cáo.
+    """
+    validator = schema_validator('ProductInput')
+    report = {'imported': 0, 'failed': 0, 'errors': []}
+    batch = []
+
+    try:
+        for line_no, line in enumerate(io.BytesIO(connexion.request.get_data()), 1):
+            if not line.strip():
+                continue
+            try:
+                record = json.loads(line)
+            except ValueError as e:
+                _import_error(report, line_no, f'JSON không hợp lệ: {e}')
+                continue
+
+            message = first_error(validator, record)
+            if message:
+                _import_error(report, line_no, message)
+                continue
+
+            product = DbProduct(
+                name=record['name'],
+                price=record['price'],
+                description=record.get('description')
+            )
+            try:
+                product.validate()
+            except ValidationError as e:
+                _import_error(report, line_no, str(e))
+                continue
+
+            batch.append((line_no, product.to_mongo().to_dict()))
+            if len(batch) >= batch_size:
+                _write_import_batch(batch, report)
+                batch = []
+
+        if batch:
+            _write_import_batch(batch, report)
+    except Exception as e:
+        logger.error(f"Lỗi khi import sản phẩm: {str(e)}", exc_info=True)
+        return dict(report, message=str(e)), 500
+
+    report['errors_truncated'] = report['failed'] > len(report['errors'])
+    logger.info(f"Import xong: {report['imported']} thành công, {report['failed']} lỗi")
+    return report, 200
+
+def _batch_cost():
+    # Mỗi thao tác trong batch tính là một đơn vị hạn mức
+    body = connexion.request.get_json(silent=True) or {}
+    return max(len(body.get('operations') or []), 1)
+
+def _batch_result(index, op, product_id, status, product=None, message=None):
+    result = {'index': index, 'op': op, 'id': product_id, 'status': status}
+    if product is not None:
+        result['product'] = product
+    if message is not None:
+        result['message'] = message
+    return result
+
+@limiter.limit(BATCH_RATE_LIMIT, cost=_batch_cost)
+def batch_products():
+    """
+    Thực thi nhiều thao tác create/update/delete trong một request.
+    Mọi thao tác hợp lệ được ghi bằng một lần bulk_write không thứ tự. Tổng cộng tối đa
+    3 round trip: đọc trước các product bị delete, bulk_write, đọc lại các product bị
+    update/delete để xác định kết quả. Kết quả trả về theo từng thao tác, sự kiện webhook
+    được ghi vào outbox thành một lô.
+    """
+    operations = connexion.request.get_json()['operations']
+    if len(operations) > BATCH_MAX_OPS:
+        return {'message': f'Tối đa {BATCH_MAX_OPS} thao tác mỗi request'}, 400
+
+    results = [None] * len(operations)
+    writes = []     # (index, op, id, document/thay đổi, version mong đợi)
+    seen = set()
+
+    # 1. Validate từng thao tác, dựng document/update tương ứng
+    for index, operation in enumerate(operations):
+        op, product_id = operation['op'], operation.get('id')
+        if op != 'create':
+            if not product_id or not ObjectId.is_valid(product_id):
+                results[index] = _batch_result(index, op, product_id, 400, message='id không hợp lệ')
+                continue
+            if product_id in seen:
+                results[index] = _batch_result(index, op, product_id, 400, message='id xuất hiện nhiều lần trong batch')
+                continue
+            seen.add(product_id)
+        if op == 'delete':
+            writes.append((index, op, product_id, None, operation.get('version')))
+            continue
+
+        data = operation.get('data')
+        if not data:
+            results[index] = _batch_result(index, op, product_id, 400, message='Thiếu data')
+            continue
+        product = DbProduct(name=data.get('name'), price=data.get('price'), description=data.get('description'))
+        try:
+            product.validate()
+        except ValidationError as e:
+            results[index] = _batch_result(index, op, product_id, 400, message=str(e))
+            continue
+
+        if op == 'create':
+            product.id = ObjectId()
+            doc = product.to_mongo().to_dict()
+            writes.append((index, op, str(product.id), doc, None))
+        else:
+            changes = {'name': product.name, 'price': product.price,
+                       'description': product.description, 'name_grams': product.name_grams}
+            writes.append((index, op, product_id, changes, operation.get('version')))
+
+    # 2. Đọc trước (một truy vấn $in) các product bị delete: trạng thái trước khi xoá
+    #    cho sự kiện product.deleted; id không tồn tại thì báo 404 ngay, không gửi DeleteOne
+    collection = DbProduct._get_collection()
+    delete_ids = [ObjectId(product_id) for _, op, product_id, _, _ in writes if op == 'delete']
+    before = {}
+    if delete_ids:
+        for doc in collection.find({'_id': {'$in': delete_ids}}, {'name_grams': 0}):
+            before[doc['_id']] = doc
+
+    # 3. Một lần bulk_write không thứ tự cho mọi thao tác hợp lệ. Mỗi update gắn một
+    #    batch_token riêng: sau khi ghi, token còn trên document nghĩa là chính thao tác này
+    #    đã được áp dụng (không suy từ số version, vốn sai khi có ghi đồng thời)
+    requests, pending = [], []   # pending[i] ứng với requests[i]: (index, op, id, doc/token)
+    for index, op, product_id, change, version in writes:
+        if op == 'create':
+            requests.append(InsertOne(change))
+            pending.append((index, op, product_id, change))
+            continue
+        oid = ObjectId(product_id)
+        condition = {'_id': oid}
+        if version is not None:
+            # Sản phẩm cũ chưa được backfill version được coi là version 1
+            condition['version'] = {'$in': [version, None]} if version == 1 else version
+        if op == 'delete':
+            if oid not in before:
+                results[index] = _batch_result(index, op, product_id, 404, message='Không tìm thấy sản phẩm')
+                continue
+            requests.append(DeleteOne(condition))
+            pending.append((index, op, product_id, before[oid]))
+            continue
+        token = ObjectId()
+        stamped = dict(change, batch_token=token)
+        # Hai UpdateOne loại trừ nhau qua token: document đã có version thì $inc; sản phẩm cũ
+        # chưa có version (ETag "1") thì đặt thẳng version=2 như update_product
+        requests.append(UpdateOne(
+            {'$and': [condition, {'version': {'$exists': True}, 'batch_token': {'$ne': token}}]},
+            {'$set': stamped, '$inc': {'version': 1}}))
+        requests.append(UpdateOne(
+            {'$and': [condition, {'version': {'$exists': False}}]},
+            {'$set': dict(stamped, version=2)}))
+        pending.append((index, op, product_id, token))
+        pending.append(None)
+
+    failed = {}
+    if requests:
+        try:
+            collection.bulk_write(requests, ordered=False)
+        except BulkWriteError as e:
+            for error in e.details.get('writeErrors', []):
+                failed[error['index']] = error.get('errmsg', 'Lỗi ghi dữ liệu')
+
+    # 4. Đọc lại (một truy vấn $in) các product bị update/delete để lấy kết quả từng thao tác:
+    #    update thành công khi token của nó còn trên document; delete thành công khi document
+    #    đã mất. Còn lại là 404 (không tồn tại) hoặc 412 (version không khớp / ghi đồng thời)
+    after = {}
+    touched = [ObjectId(entry[2]) for entry in pending if entry is not None and entry[1] != 'create']
+    if touched:
+        for doc in collection.find({'_id': {'$in': touched}}, {'name_grams': 0}):
+            after[doc['_id']] = doc
+
+    events = {'product.created': [], 'product.updated': [], 'product.deleted': []}
+    for position, entry in enumerate(pending):
+        if entry is None:
+            continue
+        index, op, product_id, state = entry
+        if position in failed:
+            results[index] = _batch_result(index, op, product_id, 400, message=failed[position])
+        elif op == 'create':
+            data = DbProduct.raw_to_dict(state)
+            results[index] = _batch_result(index, op, product_id, 201, product=data)
+            events['product.created'].append(data)
+        elif op == 'update':
+            current = after.get(ObjectId(product_id))
+            if current is None:
+                results[index] = _batch_result(index, op, product_id, 404, message='Không tìm thấy sản phẩm')
+            elif current.get('batch_token') != state:
+                results[index] = _batch_result(index, op, product_id, 412, message='Sản phẩm đã bị thay đổi (version không khớp)')
+            else:
+                data = DbProduct.raw_to_dict(current)
+                results[index] = _batch_result(index, op, product_id, 200, product=data)
+                events['product.updated'].append(data)
+        elif state['_id'] in after:
+            results[index] = _batch_result(index, op, product_id, 412, message='Sản phẩm đã bị thay đổi (version không khớp)')
+        else:
+            data = DbProduct.raw_to_dict(state)
+            results[index] = _batch_result(index, op, product_id, 204)
+            events['product.deleted'].append(data)
+
+    # 5. Sự kiện của cả batch ghi vào outbox trong một lần insert
+    trigger_events([(event_type, data) for event_type, items in events.items() for data in items])
+    for event_type, items in events.items():
+        if items:
+            product_changed(event_type, items)
+
+    succeeded = sum(1 for result in results if result['status'] < 300)
+    logger.info(f"Batch xong: {succeeded}/{len(results)} thao tác thành công")
+    return {'results': results, 'succeeded': succeeded, 'failed': len(results) - succeeded}, 200
+
+def _if_match_filter():
+    """
+    Điều kiện version từ header If-Match (so sánh strong).
+    Trả về None nếu không có If-Match hoặc If-Match: *, khi đó chỉ cần product tồn tại.
+    """
+    if_match = connexion.request.if_match
+    if not if_match or if_match.star_tag:
+        return None
+    versions = [int(tag) for tag in if_match.as_set() if tag.isdigit()]
+    condition = Q(version__in=versions)
+    if 1 in versions:
+        condition |= Q(version__exists=False)  # Sản phẩm cũ chưa được backfill version
+    return condition
+
+def _precondition_failed(product_id):
+    """Ghi có điều kiện không khớp: phân biệt 404 (không tồn tại) và 412 (version đã đổi)"""
+    if DbProduct.objects(id=product_id).only('id').as_pymongo().first() is None:
+        return {'message': 'Không tìm thấy sản phẩm'}, 404
+    return {'message': 'Sản phẩm đã bị thay đổi (ETag không khớp)'}, 412
+
 @limiter.limit("30 per minute") # Cho phép xem chi tiết nhiều hơn
 def get_product_by_id(product_id):
     """Lấy thông tin sản phẩm bằng ID"""
     try:
-        product = DbProduct.objects.get(id=product_id)
-        return product.to_dict(), 200
+        # Read-through cache: các request đồng thời cùng id chỉ đọc Mongo một lần
+        cached = product_cache.get(product_id)
+        if cached is None:
+            raise DoesNotExist()
+        product, version = cached
+        etag = f'"{version}"'
+        if connexion.request.if_none_match.contains_weak(str(version)):
+            return '', 304, {'ETag': etag}
+        return product, 200, {'ETag': etag}
     except DoesNotExist:
         logger.info(f"Không tìm thấy sản phẩm ID: {product_id}")
         return {'message': 'Không tìm thấy sản phẩm'}, 404
@@ -104,16 +518,38 @@ def update_product(product_id):
     if connexion.request.is_json:
         body = ApiProduct.from_dict(connexion.request.get_json())
         try:
-            product = DbProduct.objects.get(id=product_id)
-            product.name = body.name
-            product.price = body.price
-            product.description = body.description
-            product.save()
-            trigger_event('product.updated', product.to_dict()) # Gọi Service để gửi thông báo
+            # Validate trước (clean() tính luôn name_grams) để không ghi dữ liệu sai xuống DB
+            changes = DbProduct(name=body.name, price=body.price, description=body.description)
+            changes.validate()
+
+            # find_one_and_update trả về bản sau khi cập nhật, không có khe lost-update (một round trip,
+            # thêm một lần với sản phẩm cũ chưa có version).
+            # Có If-Match thì chỉ cập nhật khi version còn khớp (optimistic concurrency)
+            condition = _if_match_filter()
+            query = DbProduct.objects(id=product_id)
+            if condition is not None:
+                query = query.filter(condition)
+            update = dict(
+                set__name=changes.name,
+                set__price=changes.price,
+                set__description=changes.description,
+                set__name_grams=changes.name_grams)
+            query = query.exclude('name_grams')
+            product = query.filter(version__exists=True).modify(new=True, inc__version=1, **update)
+            if product is None:
+                # Sản phẩm cũ chưa backfill (ETag "1"): $inc sẽ cho lại version 1 và ETag cũ
+                # vẫn qua If-Match, nên đặt thẳng version=2
+                product = query.filter(version__exists=False).modify(new=True, set__version=2, **update)
+            if product is None:
+                if condition is not None:
+                    return _precondition_failed(product_id)
+                return {'message': 'Không tìm thấy sản phẩm'}, 404
+
+            data = product.to_dict()
+            trigger_event('product.updated', data) # Gọi Service để gửi thông báo
+            product_changed('product.updated', [data])
             logger.info(f"Đã cập nhật sản phẩm {product_id}")
-            return product.to_dict(), 200
-        except DoesNotExist:
-            return {'message': 'Không tìm thấy sản phẩm'}, 404
+            return data, 200, {'ETag': product.etag}
         except ValidationError as e:
             return {'message': str(e)}, 400
         except Exception as e:
@@ -126,13 +562,24 @@ def update_product(product_id):
 def delete_product(product_id):
     """Xóa một sản phẩm"""
     try:
-        product = DbProduct.objects.get(id=product_id)
-        product.delete()
-        trigger_event('product.deleted', product.to_dict())
+        # Một round trip: find_one_and_delete trả về document vừa xoá (kèm điều kiện If-Match nếu có)
+        condition = _if_match_filter()
+        query = DbProduct.objects(id=product_id)
+        if condition is not None:
+            query = query.filter(condition)
+        product = query.exclude('name_grams').modify(remove=True)
+        if product is None:
+            if condition is not None:
+                return _precondition_failed(product_id)
+            return {'message': 'Không tìm thấy sản phẩm'}, 404
+
+        data = product.to_dict()
+        trigger_event('product.deleted', data)
+        product_changed('product.deleted', [data])
         logger.info(f"Đã xóa sản phẩm {product_id}")
         return '', 204 
-    except DoesNotExist:
-        return {'message': 'Không tìm thấy sản phẩm'}, 404
+    except ValidationError as e:
+        return {'message': str(e)}, 400
     except Exception as e:
         logger.error(f"Lỗi xóa {product_id}: {str(e)}")
         return {'message': str(e)}, 500
\ No newline at end of file
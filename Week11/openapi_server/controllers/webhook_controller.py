@@ -1,6 +1,7 @@
 import connexion
-from openapi_server.db_models import Webhook
+from openapi_server.db_models import Webhook, DeadLetter
 from mongoengine.errors import ValidationError
+from openapi_server.services.webhook_service import subscriber_index, delivery
 
 def create_webhook():
     """API để client đăng ký nhận thông báo"""
@@ -9,12 +10,36 @@ def create_webhook():
         try:
             webhook = Webhook(
                 url=body['url'],
-                events=body['events']
+                events=body['events'],
+                secret=body.get('secret'),
+                batch_size=body.get('batch_size'),
+                batch_window_ms=body.get('batch_window_ms'),
+                coalesce_window_ms=body.get('coalesce_window_ms')
             )
             webhook.save()
+            subscriber_index.invalidate() # Các worker khác sẽ nạp lại index
             return webhook.to_dict(), 201
         except ValidationError as e:
             return {'message': str(e)}, 400
         except Exception as e:
             return {'message': str(e)}, 500
-    return 'Invalid input', 400
\ No newline at end of file
+    return 'Invalid input', 400
+
+def list_dead_letters(limit=50):
+    """Xem các webhook gửi thất bại (mới nhất trước)"""
+    try:
+        letters = DeadLetter.objects.order_by('-created_at').limit(limit)
+        return [letter.to_dict() for letter in letters], 200
+    except Exception as e:
+        return {'message': str(e)}, 500
+
+def replay_dead_letters():
+    """Đưa các dead letter trở lại hàng đợi gửi (tất cả hoặc theo danh sách ids)"""
+    body = connexion.request.get_json(silent=True) or {}
+    try:
+        replayed = delivery.replay(ids=body.get('ids'), limit=body.get('limit', 100))
+        return {'replayed': replayed}, 202
+    except ValidationError as e:
+        return {'message': str(e)}, 400
+    except Exception as e:
+        return {'message': str(e)}, 500
@@ -1,6 +1,7 @@
 # swagger_server/db_models.py
-from mongoengine import Document, StringField, FloatField, ListField, URLField, DateTimeField
+from mongoengine import Document, StringField, FloatField, ListField, URLField, DateTimeField, DictField, IntField, BinaryField, ObjectIdField
 import datetime
+from openapi_server.services.text_tokens import name_grams
 
 class Product(Document):
     """
@@ -10,6 +11,40 @@ class Product(Document):
     name = StringField(required=True, max_length=200)
     price = FloatField(required=True)
     description = StringField()
+    # Bigram/trigram của tên đã chuẩn hoá, phục vụ tìm kiếm chuỗi con bằng index
+    name_grams = ListField(StringField())
+    # Tăng 1 sau mỗi lần ghi; dùng làm ETag và điều kiện If-Match
+    version = IntField(default=1, min_value=1)
+    created_at = DateTimeField(default=datetime.datetime.utcnow)
+    # Token của thao tác batch ghi gần nhất: POST /products:batch đọc lại để biết update nào đã được áp dụng
+    batch_token = ObjectIdField()
+
+    meta = {
+        # Index được tạo ở bước đồng bộ lúc khởi động (services/index_manager.py),
+        # không để request đầu tiên phải chờ createIndexes
+        'auto_create_index': False,
+        'indexes': [
+            {'fields': ['name_grams'], 'name': 'name_grams'},
+            # (trường sort, _id): range scan theo giá và phân trang keyset ổn định
+            {'fields': ['price', 'id'], 'name': 'price_id'},
+            {'fields': ['name', 'id'], 'name': 'name_id'},
+            {'fields': ['created_at'], 'name': 'created_at'}
+        ]
+    }
+
+    def clean(self):
+        # MongoEngine gọi clean() trước khi validate/save
+        self.name_grams = name_grams(self.name)
+
+    @property
+    def etag(self):
+        """Strong ETag của phiên bản hiện tại"""
+        return f'"{self.version}"'
+
+    @classmethod
+    def backfill_versions(cls):
+        """Gán version=1 cho các sản phẩm tạo trước khi có trường version"""
+        return cls.objects(version__exists=False).update(set__version=1)
 
     # Giúp chuyển đổi Document của MongoEngine sang dict
     def to_dict(self):
@@ -20,6 +55,16 @@ class Product(Document):
             "description": self.description
         }
 
+    # Giống to_dict nhưng đọc thẳng từ document thô (as_pymongo), không tạo Document
+    @staticmethod
+    def raw_to_dict(doc):
+        return {
+            "id": str(doc["_id"]),
+            "name": doc.get("name"),
+            "price": doc.get("price"),
+            "description": doc.get("description")
+        }
+
 class Webhook(Document):
     """
     Lưu trữ các URL đăng ký nhận thông báo (Subscribers)
@@ -28,12 +73,101 @@ class Webhook(Document):
     url = URLField(required=True) # Endpoint của client nhận thông báo
     events = ListField(StringField(), required=True) # ['product.created', 'product.updated']
     secret = StringField() # Dùng để ký request (HMAC) bảo mật
+    # Gửi theo lô (tuỳ chọn): tối đa batch_size sự kiện hoặc chờ tối đa batch_window_ms
+    batch_size = IntField(min_value=1, max_value=1000)
+    batch_window_ms = IntField(min_value=1, max_value=60000)
+    # Gộp sự kiện (tuỳ chọn): trong cửa sổ này chỉ gửi trạng thái cuối của mỗi product
+    coalesce_window_ms = IntField(min_value=1, max_value=60000)
     created_at = DateTimeField(default=datetime.datetime.utcnow)
 
+    meta = {
+        'auto_create_index': False,
+        'indexes': [
+            # Multikey: tìm subscriber theo loại sự kiện
+            {'fields': ['events'], 'name': 'events'},
+            {'fields': ['created_at'], 'name': 'created_at'}
+        ]
+    }
+
     def to_dict(self):
         return {
             'id': str(self.id),
             'url': self.url,
             'events': self.events,
+            'batch_size': self.batch_size,
+            'batch_window_ms': self.batch_window_ms,
+            'coalesce_window_ms': self.coalesce_window_ms,
+            'created_at': self.created_at.isoformat()
+        }
+
+class WebhookSpill(Document):
+    """
+    Job webhook bị tràn khỏi hàng đợi in-memory của dispatcher (backpressure='spill').
+    Worker sẽ nạp lại khi hàng đợi còn chỗ trống.
+    """
+    job = DictField(required=True) # {'url', 'subscriber', 'event', 'body', 'attempt'}
+    created_at = DateTimeField(default=datetime.datetime.utcnow)
+
+class OutboxEvent(Document):
+    """
+    Transactional Outbox: sự kiện product được ghi ngay trong luồng lưu dữ liệu,
+    relay (services/outbox_relay.py) sẽ đọc và fan-out tới subscriber sau.
+    Sự kiện nằm trong Mongo nên không bị mất khi worker khởi động lại.
+    """
+    event = StringField(required=True) # 'product.created', ...
+    data = DictField()
+    status = StringField(default='pending', choices=('pending', 'processing'))
+    claimed_by = StringField() # Token của relay đang xử lý
+    claimed_at = DateTimeField()
+    created_at = DateTimeField(default=datetime.datetime.utcnow)
+
+    meta = {
+        'auto_create_index': False,
+        'indexes': [('status', 'created_at')]
+    }
+
+class Counter(Document):
+    """
+    Bộ đếm phiên bản dùng chung giữa các worker Gunicorn.
+    Ví dụ: 'webhooks' tăng mỗi khi danh sách subscriber thay đổi.
+    """
+    name = StringField(required=True, unique=True)
+    value = IntField(default=0)
+
+    @classmethod
+    def bump(cls, name):
+        cls.objects(name=name).update_one(inc__value=1, upsert=True)
+
+    @classmethod
+    def current(cls, name):
+        return cls.objects(name=name).scalar('value').first() or 0
+
+class DeadLetter(Document):
+    """
+    Webhook gửi thất bại vĩnh viễn (hết lượt retry hoặc bị subscriber từ chối).
+    Số bản ghi được giới hạn, có thể replay qua POST /webhooks/dead-letters/replay.
+    """
+    url = URLField(required=True)
+    subscriber = StringField() # ID của Webhook
+    event = StringField()
+    body = BinaryField(required=True) # Payload JSON đã serialise
+    headers = DictField()
+    attempts = IntField(default=0)
+    last_error = StringField()
+    created_at = DateTimeField(default=datetime.datetime.utcnow)
+
+    meta = {
+        'auto_create_index': False,
+        'indexes': ['created_at']
+    }
+
+    def to_dict(self):
+        return {
+            'id': str(self.id),
+            'url': self.url,
+            'subscriber': self.subscriber,
+            'event': self.event,
+            'attempts': self.attempts,
+            'last_error': self.last_error,
             'created_at': self.created_at.isoformat()
-        }
\ No newline at end of file
+        }
@@ -1,19 +1,107 @@
+import os
+import json
+import datetime
+from decimal import Decimal
+
+from bson import ObjectId
+from connexion.apis.flask_api import FlaskApi
 from connexion.apps.flask_app import FlaskJSONEncoder
+from connexion.jsonifier import Jsonifier
 
 from openapi_server.models.base_model import Model
 
+try:
+    import orjson
+except ImportError:  # orjson là tuỳ chọn: không có thì dùng json của stdlib
+    orjson = None
+
+
+def _model_to_json(o):
+    # Chỉ gặp khi controller trả về Model; dict (vd. DbProduct.to_dict) không đi qua đây
+    dikt = {}
+    attribute_map = o.attribute_map
+    for attr in o.openapi_types:
+        value = getattr(o, attr)
+        if value is not None:
+            dikt[attribute_map[attr]] = value
+    return dikt
+
+
+def _default(o):
+    """Các kiểu backend JSON không tự xử lý được"""
+    if isinstance(o, Model):
+        return _model_to_json(o)
+    if isinstance(o, ObjectId):
+        return str(o)
+    if isinstance(o, datetime.datetime):
+        if o.tzinfo:
+            return o.isoformat('T')
+        return o.isoformat('T') + 'Z'  # Không có timezone: coi là UTC
+    if isinstance(o, datetime.date):
+        return o.isoformat()
+    if isinstance(o, Decimal):
+        return float(o)
+    raise TypeError(f'Object of type {type(o).__name__} is not JSON serializable')
+
 
 class JSONEncoder(FlaskJSONEncoder):
     include_nulls = False
 
     def default(self, o):
         if isinstance(o, Model):
-            dikt = {}
-            for attr in o.openapi_types:
-                value = getattr(o, attr)
-                if value is None and not self.include_nulls:
-                    continue
-                attr = o.attribute_map[attr]
-                dikt[attr] = value
-            return dikt
+            if self.include_nulls:
+                return {o.attribute_map[attr]: getattr(o, attr) for attr in o.openapi_types}
+            return _model_to_json(o)
+        if isinstance(o, ObjectId):
+            return str(o)
         return FlaskJSONEncoder.default(self, o)
+
+
+class FastJsonifier(Jsonifier):
+    """
+    Jsonifier cho response của connexion: output gọn (không indent), trả về bytes.
+      - orjson (nếu đã cài, JSON_BACKEND=auto|orjson): dict/list/str/số/datetime
+        được encode hoàn toàn trong C, chỉ gọi _default cho Model, ObjectId, Decimal
+      - stdlib (JSON_BACKEND=stdlib hoặc không có orjson): json.dumps không indent
+        nên dùng được C encoder của stdlib
+    """
+
+    def __init__(self, backend=None):
+        backend = backend or os.getenv('JSON_BACKEND', 'auto')
+        if backend == 'orjson' and orjson is None:
+            raise ImportError('JSON_BACKEND=orjson nhưng chưa cài orjson')
+        self.backend = 'orjson' if backend in ('auto', 'orjson') and orjson is not None else 'stdlib'
+        super().__init__(orjson if self.backend == 'orjson' else json)
+
+    def dumps(self, data, **kwargs):
+        if self.backend == 'orjson':
+            # Datetime không timezone được coi là UTC và ghi hậu tố 'Z' như JSONEncoder
+            return orjson.dumps(data, default=_default,
+                                option=orjson.OPT_NAIVE_UTC | orjson.OPT_UTC_Z
+                                | orjson.OPT_NON_STR_KEYS | orjson.OPT_APPEND_NEWLINE)
+        return (json.dumps(data, default=_default, ensure_ascii=False,
+                           separators=(',', ':')) + '\n').encode()
+
+    def loads(self, data):
+        try:
+            return self.json.loads(data)
+        except Exception:
+            if isinstance(data, bytes):
+                data = data.decode()
+            if isinstance(data, str):
+                return data
+            raise
+
+
+class FastFlaskApi(FlaskApi):
+    """FlaskApi dùng FastJsonifier cho body JSON của response"""
+
+    @classmethod
+    def _set_jsonifier(cls):
+        cls.jsonifier = FastJsonifier()
+
+
+def install(app):
+    """Gắn encoder vào connexion App; gọi trước add_api"""
+    app.app.json_encoder = JSONEncoder
+    app.api_cls = FastFlaskApi
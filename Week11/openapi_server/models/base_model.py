@@ -1,4 +1,5 @@
 import pprint
+import operator
 
 import typing
 
@@ -7,7 +8,25 @@ from openapi_server import util
 T = typing.TypeVar('T')
 
 
+# Giá trị không cần chuyển đổi trong to_dict
+_SCALARS = (str, int, float, bool, type(None))
+
+# Mỗi class model một attrgetter đọc toàn bộ slot, dùng cho __eq__
+_state_getters = {}
+
+
+def _state_getter(klass):
+    getter = _state_getters.get(klass)
+    if getter is None:
+        slots = [slot for cls in klass.__mro__ for slot in getattr(cls, '__slots__', ())]
+        getter = _state_getters[klass] = operator.attrgetter(*slots) if slots else (lambda model: ())
+    return getter
+
+
 class Model:
+    # Model con khai báo __slots__ cho các trường, không có __dict__ theo từng instance
+    __slots__ = ()
+
     # openapiTypes: The key is attribute name and the
     # value is attribute type.
     openapi_types: typing.Dict[str, type] = {}
@@ -30,19 +49,16 @@ class Model:
 
         for attr in self.openapi_types:
             value = getattr(self, attr)
-            if isinstance(value, list):
-                result[attr] = list(map(
-                    lambda x: x.to_dict() if hasattr(x, "to_dict") else x,
-                    value
-                ))
+            if type(value) in _SCALARS:
+                result[attr] = value
+            elif isinstance(value, list):
+                result[attr] = [x.to_dict() if hasattr(x, "to_dict") else x
+                                for x in value]
             elif hasattr(value, "to_dict"):
                 result[attr] = value.to_dict()
             elif isinstance(value, dict):
-                result[attr] = dict(map(
-                    lambda item: (item[0], item[1].to_dict())
-                    if hasattr(item[1], "to_dict") else item,
-                    value.items()
-                ))
+                result[attr] = {k: v.to_dict() if hasattr(v, "to_dict") else v
+                                for k, v in value.items()}
             else:
                 result[attr] = value
 
@@ -61,7 +77,10 @@ class Model:
 
     def __eq__(self, other):
         """Returns true if both objects are equal"""
-        return self.__dict__ == other.__dict__
+        if type(other) is not type(self):
+            return False
+        state = _state_getter(type(self))
+        return state(self) == state(other)
 
     def __ne__(self, other):
         """Returns true if both objects are not equal"""
@@ -12,6 +12,18 @@ class Error(Model):
     Do not edit the class manually.
     """
 
+    __slots__ = ('_message', '_code')
+
+    openapi_types = {
+        'message': str,
+        'code': int
+    }
+
+    attribute_map = {
+        'message': 'message',
+        'code': 'code'
+    }
+
     def __init__(self, message=None, code=None):  # noqa: E501
         """Error - a model defined in OpenAPI
 
@@ -20,16 +32,6 @@ class Error(Model):
         :param code: The code of this Error.  # noqa: E501
         :type code: int
         """
-        self.openapi_types = {
-            'message': str,
-            'code': int
-        }
-
-        self.attribute_map = {
-            'message': 'message',
-            'code': 'code'
-        }
-
         self._message = message
         self._code = code
 
@@ -12,6 +12,24 @@ class Product(Model):
     Do not edit the class manually.
     """
 
+    __slots__ = ('_id', '_name', '_price', '_description', '_created_at')
+
+    openapi_types = {
+        'id': str,
+        'name': str,
+        'price': float,
+        'description': str,
+        'created_at': datetime
+    }
+
+    attribute_map = {
+        'id': 'id',
+        'name': 'name',
+        'price': 'price',
+        'description': 'description',
+        'created_at': 'createdAt'
+    }
+
     def __init__(self, id=None, name=None, price=None, description=None, created_at=None):  # noqa: E501
         """Product - a model defined in OpenAPI
 
@@ -26,22 +44,6 @@ class Product(Model):
         :param created_at: The created_at of this Product.  # noqa: E501
         :type created_at: datetime
         """
-        self.openapi_types = {
-            'id': str,
-            'name': str,
-            'price': float,
-            'description': str,
-            'created_at': datetime
-        }
-
-        self.attribute_map = {
-            'id': 'id',
-            'name': 'name',
-            'price': 'price',
-            'description': 'description',
-            'created_at': 'createdAt'
-        }
-
         self._id = id
         self._name = name
         self._price = price
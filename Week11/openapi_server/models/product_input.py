@@ -12,6 +12,20 @@ class ProductInput(Model):
     Do not edit the class manually.
     """
 
+    __slots__ = ('_name', '_price', '_description')
+
+    openapi_types = {
+        'name': str,
+        'price': float,
+        'description': str
+    }
+
+    attribute_map = {
+        'name': 'name',
+        'price': 'price',
+        'description': 'description'
+    }
+
     def __init__(self, name=None, price=None, description=None):  # noqa: E501
         """ProductInput - a model defined in OpenAPI
 
@@ -22,18 +36,6 @@ class ProductInput(Model):
         :param description: The description of this ProductInput.  # noqa: E501
         :type description: str
         """
-        self.openapi_types = {
-            'name': str,
-            'price': float,
-            'description': str
-        }
-
-        self.attribute_map = {
-            'name': 'name',
-            'price': 'price',
-            'description': 'description'
-        }
-
         self._name = name
         self._price = price
         self._description = description
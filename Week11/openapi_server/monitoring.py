@@ -0,0 +1,36 @@
+# monitoring.py
+from prometheus_client.core import CounterMetricFamily, GaugeMetricFamily
+
+
+class StatsCollector:
+    """
+    Collector Prometheus đọc số liệu từ một component nội bộ (dispatcher, cache...).
+    Component chỉ cần trả về dict số liệu qua `stats_fn`, collector sẽ
+    đọc giá trị mới nhất mỗi lần Prometheus scrape /metrics.
+    """
+
+    def __init__(self, prefix, stats_fn, counters=None, gauges=None):
+        self.prefix = prefix
+        self.stats_fn = stats_fn
+        self.counters = counters or {}  # {tên: mô tả}
+        self.gauges = gauges or {}
+
+    def describe(self):
+        # Trả về rỗng để registry không gọi collect() lúc đăng ký
+        return []
+
+    def collect(self):
+        stats = self.stats_fn()
+        for name, documentation in self.counters.items():
+            yield CounterMetricFamily(f'{self.prefix}_{name}', documentation,
+                                      value=stats.get(name, 0))
+        for name, documentation in self.gauges.items():
+            yield GaugeMetricFamily(f'{self.prefix}_{name}', documentation,
+                                    value=stats.get(name, 0))
+
+
+def register_stats(metrics, prefix, stats_fn, counters=None, gauges=None):
+    """Gắn số liệu của một component vào registry của PrometheusMetrics"""
+    collector = StatsCollector(prefix, stats_fn, counters=counters, gauges=gauges)
+    metrics.registry.register(collector)
+    return collector
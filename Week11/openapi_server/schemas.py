@@ -0,0 +1,34 @@
+# schemas.py
+import os
+import functools
+import yaml
+from jsonschema import Draft4Validator
+from openapi_server.validation import compile_schema
+
+SPEC_PATH = os.path.join(os.path.dirname(__file__), 'openapi', 'openapi.yaml')
+
+
+@functools.lru_cache(maxsize=None)
+def load_spec():
+    """Đọc openapi.yaml một lần cho cả process"""
+    with open(SPEC_PATH, encoding='utf-8') as f:
+        return yaml.safe_load(f)
+
+
+@functools.lru_cache(maxsize=None)
+def schema_validator(name):
+    """
+    Validator (Draft4, giống connexion) cho một schema trong components/schemas,
+    dùng khi phải tự validate dữ liệu không đi qua requestBody (vd. từng dòng NDJSON).
+    """
+    return Draft4Validator(load_spec()['components']['schemas'][name])
+
+
+def first_error(validator, instance):
+    """Thông báo lỗi đầu tiên (None nếu hợp lệ)"""
+    check = compile_schema(validator.schema, validator.format_checker)
+    if check is not None and check(instance):
+        return None
+    for error in validator.iter_errors(instance):
+        return error.message
+    return None
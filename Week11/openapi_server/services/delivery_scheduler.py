@@ -0,0 +1,340 @@
+import os
+import time
+import heapq
+import random
+import logging
+import itertools
+import threading
+from collections import deque
+from openapi_server.db_models import DeadLetter
+from openapi_server.monitoring import register_stats
+
+logger = logging.getLogger(__name__)
+
+
+class CircuitBreaker:
+    """
+    Circuit breaker cho một subscriber.
+      - closed: gửi bình thường, đếm số lỗi liên tiếp
+      - open: sau `failure_threshold` lỗi liên tiếp, chặn mọi lần gửi trong `reset_timeout` giây
+      - half_open: hết thời gian chờ, cho đúng một lần gửi thử; thành công thì đóng lại
+    """
+
+    CLOSED, OPEN, HALF_OPEN = 'closed', 'open', 'half_open'
+
+    def __init__(self, failure_threshold, reset_timeout, clock=time.monotonic):
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.clock = clock
+        self.state = self.CLOSED
+        self.failures = 0
+        self.opened_at = 0.0
+        self._lock = threading.Lock()
+
+    def allow(self):
+        with self._lock:
+            if self.state == self.CLOSED:
+                return True
+            if self.state == self.OPEN and self.clock() - self.opened_at >= self.reset_timeout:
+                self.state = self.HALF_OPEN
+                return True  # Lần gửi thử duy nhất
+            return False
+
+    def retry_after(self):
+        """Số giây còn lại trước khi breaker cho gửi thử"""
+        with self._lock:
+            if self.state == self.CLOSED:
+                return 0.0
+            return max(self.reset_timeout - (self.clock() - self.opened_at), 0.0)
+
+    def record_success(self):
+        with self._lock:
+            self.state = self.CLOSED
+            self.failures = 0
+
+    def record_failure(self):
+        with self._lock:
+            self.failures += 1
+            if self.state == self.HALF_OPEN or self.failures >= self.failure_threshold:
+                self.state = self.OPEN
+                self.opened_at = self.clock()
+
+    def reset(self):
+        self.record_success()
+
+
+class RetryScheduler:
+    """
+    Lịch hẹn giờ dạng heap: một thread duy nhất chờ tới hạn gần nhất rồi gọi callback.
+    Job chờ retry chỉ là một phần tử trong heap, không giữ thread nào đang sleep.
+    """
+
+    def __init__(self):
+        self._heap = []  # (due, seq, fn, args)
+        self._seq = itertools.count()
+        self._cond = threading.Condition()
+        self._thread = None
+        self._pid = None
+
+    def _start(self):
+        if self._pid == os.getpid() and self._thread is not None:
+            return
+        self._pid = os.getpid()
+        self._thread = threading.Thread(target=self._run, name='webhook-retry-scheduler', daemon=True)
+        self._thread.start()
+
+    def call_later(self, delay, fn, *args):
+        with self._cond:
+            self._start()
+            heapq.heappush(self._heap, (time.monotonic() + delay, next(self._seq), fn, args))
+            self._cond.notify()
+
+    def pending(self):
+        with self._cond:
+            return len(self._heap)
+
+    def _run(self):
+        while True:
+            with self._cond:
+                while not self._heap or self._heap[0][0] > time.monotonic():
+                    timeout = self._heap[0][0] - time.monotonic() if self._heap else None
+                    self._cond.wait(timeout)
+                _, _, fn, args = heapq.heappop(self._heap)
+            try:
+                fn(*args)
+            except Exception as e:
+                logger.error(f"Scheduled callback failed: {e}", exc_info=True)
+
+
+class DeliveryScheduler:
+    """
+    Gửi một job webhook với trạng thái theo từng subscriber:
+      - Lỗi tạm thời (mất kết nối, timeout, 408/429/5xx): retry với exponential backoff
+        qua RetryScheduler, tối đa `max_attempts` lần
+      - Lỗi vĩnh viễn (4xx khác) hoặc hết lượt retry: chuyển vào dead-letter store
+      - Subscriber lỗi liên tục: circuit breaker mở, job được giữ trong danh sách chờ
+        (tối đa `park_max` job mỗi subscriber, tràn thì job cũ nhất vào dead letter) và chỉ
+        quay lại hàng đợi khi breaker cho gửi thử hoặc đóng lại
+    """
+
+    def __init__(self, client, resubmit=None, max_attempts=None, base_delay=None,
+                 max_delay=None, failure_threshold=None, reset_timeout=None,
+                 dead_letter_max=None, park_max=None):
+        self.client = client
+        self.resubmit = resubmit  # Đưa job tới hạn retry trở lại hàng đợi dispatcher
+        self.max_attempts = max_attempts or int(os.getenv('WEBHOOK_MAX_ATTEMPTS', '5'))
+        self.base_delay = base_delay or float(os.getenv('WEBHOOK_RETRY_BASE_DELAY', '1'))
+        self.max_delay = max_delay or float(os.getenv('WEBHOOK_RETRY_MAX_DELAY', '300'))
+        self.failure_threshold = failure_threshold or int(os.getenv('WEBHOOK_BREAKER_THRESHOLD', '5'))
+        self.reset_timeout = reset_timeout or float(os.getenv('WEBHOOK_BREAKER_RESET', '30'))
+        self.dead_letter_max = dead_letter_max or int(os.getenv('WEBHOOK_DEAD_LETTER_MAX', '10000'))
+        self.park_max = park_max or int(os.getenv('WEBHOOK_PARK_MAX', '1000'))
+        self.on_complete = None  # Callback khi job kết thúc hẳn (gửi xong hoặc vào dead letter)
+        self.retries = RetryScheduler()
+        self._breakers = {}
+        self._parked = {}       # subscriber -> deque job bị chặn bởi breaker đang mở
+        self._release_armed = set()
+        self._lock = threading.Lock()
+        self._counts = {
+            'delivered': 0,
+            'failed': 0,
+            'retried': 0,
+            'short_circuited': 0,
+            'dead_lettered': 0,
+        }
+
+    def breaker(self, key):
+        breaker = self._breakers.get(key)
+        if breaker is None:
+            with self._lock:
+                breaker = self._breakers.setdefault(
+                    key, CircuitBreaker(self.failure_threshold, self.reset_timeout))
+        return breaker
+
+    def _incr(self, name):
+        with self._lock:
+            self._counts[name] += 1
+
+    def backoff(self, attempt):
+        """Exponential backoff có jitter: base * 2^(attempt-1), tối đa max_delay"""
+        delay = min(self.base_delay * (2 ** (attempt - 1)), self.max_delay)
+        return delay * random.uniform(0.5, 1.0)
+
+    def deliver(self, job):
+        """Handler của dispatcher cho một job {'url', 'body', 'subscriber', 'event', 'attempt'}"""
+        url = job['url']
+        key = job.get('subscriber') or url
+        breaker = self.breaker(key)
+
+        if not breaker.allow():
+            # Endpoint đang chết: không gửi, giữ job tới khi breaker cho gửi thử. Job chưa được
+            # gửi nên không tính là một lần thử (không tiêu max_attempts trong lúc breaker mở)
+            self._incr('short_circuited')
+            self._park(key, breaker, job)
+            return
+
+        try:
+            response = self.client.post(url, job['body'], headers=job.get('headers'))
+        except Exception as e:
+            self._record_failure(key, breaker)
+            logger.warning(f"Failed to send webhook to {url}: {e}")
+            self._retry_or_dead_letter(job, str(e))
+            return
+
+        status = response.status_code
+        if status < 300:
+            self._record_success(key, breaker)
+            self._incr('delivered')
+            logger.info(f"Webhook sent to {url} | Status: {status}")
+            self._complete(job)
+        elif status in (408, 429) or status >= 500:
+            self._record_failure(key, breaker)
+            logger.warning(f"Webhook to {url} failed | Status: {status}")
+            self._retry_or_dead_letter(job, f'HTTP {status}')
+        else:
+            # Endpoint vẫn sống nhưng từ chối payload: retry cũng vô ích
+            self._record_success(key, breaker)
+            self._incr('failed')
+            self.dead_letter(job, f'HTTP {status}')
+
+    def _record_success(self, key, breaker):
+        breaker.record_success()
+        self._release_all(key)
+
+    def _record_failure(self, key, breaker):
+        breaker.record_failure()
+        if breaker.retry_after() > 0:
+            self._arm_release(key, breaker.retry_after())
+
+    # --- Job bị chặn bởi circuit breaker ---
+    def _park(self, key, breaker, job):
+        with self._lock:
+            parked = self._parked.setdefault(key, deque())
+            parked.append(dict(job, parked=True))
+            overflow = parked.popleft() if len(parked) > self.park_max else None
+        if overflow is not None:
+            self._incr('failed')
+            self.dead_letter(overflow, 'circuit open, park list full')
+        # Khi half-open (lần gửi thử đang chạy) retry_after() là 0: kết quả lần thử sẽ nhả job
+        if breaker.retry_after() > 0:
+            self._arm_release(key, breaker.retry_after())
+
+    def _arm_release(self, key, delay):
+        with self._lock:
+            if key in self._release_armed or not self._parked.get(key):
+                return
+            self._release_armed.add(key)
+        self.retries.call_later(delay * random.uniform(1.0, 1.2), self._release_one, key)
+
+    def _release_one(self, key):
+        """Breaker hết reset_timeout: đưa một job đang chờ đi làm lần gửi thử"""
+        with self._lock:
+            self._release_armed.discard(key)
+            parked = self._parked.get(key)
+            job = parked.popleft() if parked else None
+        if job is not None:
+            self.resubmit(job)
+
+    def _release_all(self, key):
+        """Breaker đã đóng: trả mọi job đang chờ của subscriber về hàng đợi"""
+        with self._lock:
+            parked = self._parked.pop(key, None)
+        for job in parked or ():
+            self.resubmit(job)
+
+    def dropped(self, job):
+        """
+        Callback của dispatcher khi job bị bỏ do backpressure. Job đã retry hoặc đã nằm
+        trong danh sách chờ thì vào dead letter thay vì mất hẳn.
+        """
+        if not job.get('attempt') and not job.get('parked'):
+            self._complete(job)
+            return
+        self._incr('failed')
+        self.dead_letter(job, 'dropped by webhook queue backpressure')
+        key = job.get('subscriber') or job['url']
+        # Lần gửi thử bị bỏ: hẹn nhả job kế tiếp để danh sách chờ không kẹt mãi
+        self._arm_release(key, max(self.breaker(key).retry_after(), self.base_delay))
+
+    def _retry_or_dead_letter(self, job, error):
+        attempt = job.get('attempt', 0) + 1
+        if attempt >= self.max_attempts:
+            self._incr('failed')
+            self.dead_letter(dict(job, attempt=attempt), error)
+            return
+        self._incr('retried')
+        self.retries.call_later(self.backoff(attempt), self.resubmit, dict(job, attempt=attempt))
+
+    def _complete(self, job):
+        if self.on_complete is not None:
+            self.on_complete(job)
+
+    def dead_letter(self, job, error):
+        """Lưu job vào dead-letter store (giữ tối đa `dead_letter_max` bản ghi mới nhất)"""
+        self._complete(job)
+        self._incr('dead_lettered')
+        logger.error(f"Webhook to {job['url']} moved to dead-letter store: {error}")
+        try:
+            DeadLetter(
+                url=job['url'],
+                subscriber=job.get('subscriber'),
+                event=job.get('event'),
+                body=job['body'],
+                headers=job.get('headers') or {},
+                attempts=job.get('attempt', 0),
+                last_error=error
+            ).save()
+            overflow = DeadLetter.objects.count() - self.dead_letter_max
+            if overflow > 0:
+                oldest = DeadLetter.objects.order_by('created_at').limit(overflow).scalar('id')
+                DeadLetter.objects(id__in=list(oldest)).delete()
+        except Exception as e:
+            logger.error(f"Failed to store dead letter for {job['url']}: {e}")
+
+    def replay(self, ids=None, limit=100):
+        """Đưa các dead letter trở lại hàng đợi gửi. Trả về số job đã replay."""
+        query = DeadLetter.objects(id__in=ids) if ids else DeadLetter.objects
+        replayed = 0
+        for letter in query.order_by('created_at').limit(limit):
+            # Người vận hành chủ động replay: cho subscriber cơ hội gửi lại ngay
+            key = letter.subscriber or letter.url
+            self.breaker(key).reset()
+            self._release_all(key)
+            accepted = self.resubmit({
+                'url': letter.url,
+                'subscriber': letter.subscriber,
+                'event': letter.event,
+                'body': letter.body,
+                'headers': letter.headers or None,
+                'attempt': 0,
+            })
+            if accepted is False:
+                break  # Hàng đợi đầy: giữ dead letter lại cho lần replay sau
+            letter.delete()
+            replayed += 1
+        return replayed
+
+    def stats(self):
+        with self._lock:
+            stats = dict(self._counts)
+            breakers = list(self._breakers.values())
+            stats['parked'] = sum(len(parked) for parked in self._parked.values())
+        stats['pending_retries'] = self.retries.pending()
+        stats['open_circuits'] = sum(1 for b in breakers if b.state != CircuitBreaker.CLOSED)
+        return stats
+
+    def init_metrics(self, metrics):
+        register_stats(
+            metrics, 'webhook_delivery', self.stats,
+            counters={
+                'delivered': 'Số webhook gửi thành công',
+                'failed': 'Số webhook thất bại vĩnh viễn',
+                'retried': 'Số lần hẹn retry',
+                'short_circuited': 'Số lần bị chặn bởi circuit breaker',
+                'dead_lettered': 'Số job chuyển vào dead-letter store',
+            },
+            gauges={
+                'pending_retries': 'Số job đang chờ tới hạn retry',
+                'open_circuits': 'Số subscriber có circuit breaker đang mở',
+                'parked': 'Số job đang chờ circuit breaker cho gửi lại',
+            })
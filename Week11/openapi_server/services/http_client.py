@@ -0,0 +1,117 @@
+import os
+import time
+import threading
+from urllib.parse import urlsplit
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.connection import HTTPConnection, HTTPSConnection
+from urllib3.connectionpool import HTTPConnectionPool, HTTPSConnectionPool
+from openapi_server.monitoring import register_stats
+
+
+def _timed_connection(connection_cls, client):
+    """Subclass connection của urllib3 để đếm số lần mở kết nối mới và thời gian connect"""
+    class TimedConnection(connection_cls):
+        def connect(self):
+            start = time.perf_counter()
+            try:
+                super().connect()
+            finally:
+                client._record_connect(time.perf_counter() - start)
+    return TimedConnection
+
+
+class _PooledAdapter(HTTPAdapter):
+    def __init__(self, client, **kwargs):
+        self._client = client  # Phải gán trước vì HTTPAdapter.__init__ gọi init_poolmanager
+        super().__init__(**kwargs)
+
+    def init_poolmanager(self, *args, **kwargs):
+        super().init_poolmanager(*args, **kwargs)
+        self.poolmanager.pool_classes_by_scheme = {
+            'http': type('TimedHTTPConnectionPool', (HTTPConnectionPool,), {
+                'ConnectionCls': _timed_connection(HTTPConnection, self._client)}),
+            'https': type('TimedHTTPSConnectionPool', (HTTPSConnectionPool,), {
+                'ConnectionCls': _timed_connection(HTTPSConnection, self._client)}),
+        }
+
+
+class DeliveryClient:
+    """
+    HTTP client gửi webhook, giữ một Session keep-alive (connection pool riêng)
+    cho mỗi host đích thay vì mở TCP/TLS mới cho mỗi lần requests.post.
+
+    Body được truyền vào dưới dạng bytes đã serialise sẵn, để một payload
+    chỉ cần encode JSON một lần rồi dùng lại cho mọi subscriber.
+    """
+
+    def __init__(self, pool_maxsize=None, connect_timeout=None, read_timeout=None):
+        self.pool_maxsize = pool_maxsize or int(os.getenv('WEBHOOK_POOL_MAXSIZE', '10'))
+        self.connect_timeout = connect_timeout or float(os.getenv('WEBHOOK_CONNECT_TIMEOUT', '2'))
+        self.read_timeout = read_timeout or float(os.getenv('WEBHOOK_READ_TIMEOUT', '5'))
+        self._sessions = {}  # (scheme, netloc) -> Session
+        self._lock = threading.Lock()
+        self._counts = {
+            'requests': 0,
+            'connects': 0,
+            'connect_seconds': 0.0,
+        }
+
+    def _session_for(self, url):
+        parts = urlsplit(url)
+        key = (parts.scheme, parts.netloc)
+        session = self._sessions.get(key)
+        if session is None:
+            with self._lock:
+                session = self._sessions.get(key)
+                if session is None:
+                    session = requests.Session()
+                    adapter = _PooledAdapter(self, pool_connections=1,
+                                             pool_maxsize=self.pool_maxsize)
+                    session.mount(f'{parts.scheme}://', adapter)
+                    self._sessions[key] = session
+        return session
+
+    def post(self, url, body, headers=None):
+        """Gửi POST với body (bytes JSON) qua pool của host tương ứng"""
+        request_headers = {'Content-Type': 'application/json'}
+        if headers:
+            request_headers.update(headers)
+        with self._lock:
+            self._counts['requests'] += 1
+        return self._session_for(url).post(
+            url, data=body, headers=request_headers,
+            timeout=(self.connect_timeout, self.read_timeout))
+
+    def close(self):
+        with self._lock:
+            sessions, self._sessions = list(self._sessions.values()), {}
+        for session in sessions:
+            session.close()
+
+    def _record_connect(self, seconds):
+        with self._lock:
+            self._counts['connects'] += 1
+            self._counts['connect_seconds'] += seconds
+
+    def stats(self):
+        with self._lock:
+            stats = dict(self._counts)
+            stats['hosts'] = len(self._sessions)
+        # Mỗi lần connect() là một kết nối mới (miss), còn lại là dùng lại từ pool (hit)
+        stats['pool_misses'] = stats['connects']
+        stats['pool_hits'] = max(stats['requests'] - stats['connects'], 0)
+        return stats
+
+    def init_metrics(self, metrics):
+        register_stats(
+            metrics, 'webhook_http', self.stats,
+            counters={
+                'requests': 'Số request webhook đã gửi',
+                'pool_hits': 'Số request dùng lại kết nối keep-alive trong pool',
+                'pool_misses': 'Số request phải mở kết nối TCP/TLS mới',
+                'connect_seconds': 'Tổng thời gian mở kết nối mới (giây)',
+            },
+            gauges={
+                'hosts': 'Số host đích đang có connection pool',
+            })
@@ -0,0 +1,104 @@
+import os
+import sys
+import json
+import logging
+import argparse
+from pymongo.errors import OperationFailure
+from openapi_server.db_models import Product, Webhook, WebhookSpill, OutboxEvent, Counter, DeadLetter
+
+logger = logging.getLogger(__name__)
+
+# Các Document có index khai báo trong meta; thêm model mới vào đây
+MODELS = (Product, Webhook, WebhookSpill, OutboxEvent, Counter, DeadLetter)
+
+# Khoá (fields) của các index đã thấy tồn tại ở lần báo cáo gần nhất, theo tên collection
+_available = {}
+
+
+def _key(fields):
+    return tuple((name, direction) for name, direction in fields)
+
+
+def sync_indexes(models=MODELS):
+    """
+    Tạo các index khai báo trong meta (createIndexes idempotent: index đã có thì bỏ qua),
+    rồi ghi log báo cáo index còn thiếu / không được dùng. Trả về báo cáo.
+    """
+    for model in models:
+        try:
+            model.ensure_indexes()
+        except Exception as e:
+            logger.error(f"Không tạo được index cho {model.__name__}: {e}")
+    report = index_report(models)
+    for name, entry in report.items():
+        if entry['missing']:
+            logger.warning(f"Index còn thiếu trên {name}: {entry['missing']}")
+        if entry['unused']:
+            logger.warning(f"Index không được dùng trên {name}: {entry['unused']}")
+        if entry['undeclared']:
+            logger.info(f"Index không khai báo trong model trên {name}: {entry['undeclared']}")
+    logger.info("Đồng bộ index MongoDB xong")
+    return report
+
+
+def index_report(models=MODELS):
+    """
+    Với mỗi collection: index khai báo nhưng chưa tồn tại (missing), index tồn tại
+    nhưng không có lượt dùng nào theo $indexStats từ lần khởi động mongod gần nhất (unused),
+    và index tồn tại mà model không khai báo (undeclared).
+    """
+    report = {}
+    for model in models:
+        collection = model._get_collection()
+        declared = {_key(spec['fields']): spec for spec in model._meta.get('index_specs', [])}
+        existing = {name: _key(info['key']) for name, info in collection.index_information().items()
+                    if name != '_id_'}
+
+        usage = {}
+        try:
+            for stat in collection.aggregate([{'$indexStats': {}}]):
+                usage[stat['name']] = stat['accesses']['ops']
+        except (OperationFailure, NotImplementedError) as e:
+            logger.info(f"Không đọc được $indexStats của {collection.name}: {e}")
+
+        existing_keys = set(existing.values())
+        _available[collection.name] = existing_keys
+        report[collection.name] = {
+            'missing': [list(key) for key in declared if key not in existing_keys],
+            'unused': sorted(name for name in existing if usage.get(name) == 0),
+            'undeclared': sorted(name for name, key in existing.items() if key not in declared),
+            'usage': usage,
+        }
+    return report
+
+
+def has_index(model, fields):
+    """
+    True nếu lần đồng bộ/báo cáo gần nhất đã thấy index `fields` trên collection của model.
+    Trước khi đồng bộ xong (hoặc nếu đồng bộ lỗi) luôn là False: người gọi không nên hint.
+    """
+    return _key(fields) in _available.get(model._get_collection_name(), ())
+
+
+def main(argv=None):
+    """CLI: python -m openapi_server.services.index_manager [--report-only]"""
+    from mongoengine import connect
+
+    parser = argparse.ArgumentParser(description='Tạo index MongoDB khai báo trong model và báo cáo mức sử dụng')
+    parser.add_argument('--report-only', action='store_true', help='Chỉ báo cáo, không tạo index')
+    args = parser.parse_args(argv)
+
+    mongo_uri = os.getenv('MONGO_URI')
+    if not mongo_uri:
+        parser.error('Cần đặt biến môi trường MONGO_URI')
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(name)s - %(levelname)s - %(message)s')
+    connect('product_db', host=mongo_uri)
+
+    report = index_report() if args.report_only else sync_indexes()
+    json.dump(report, sys.stdout, indent=2, default=str)
+    sys.stdout.write('\n')
+    return 1 if any(entry['missing'] for entry in report.values()) else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
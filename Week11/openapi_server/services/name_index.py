@@ -0,0 +1,244 @@
+import os
+import time
+import bisect
+import heapq
+import logging
+import threading
+from openapi_server.db_models import Product as DbProduct
+from openapi_server.services.text_tokens import normalize
+from openapi_server.monitoring import register_stats
+from openapi_server.services.product_hooks import on_product_change
+
+logger = logging.getLogger(__name__)
+
+_SEP = '\x00'  # Tách tên chuẩn hoá và id trong key để key luôn duy nhất
+_MAX_CHAR = chr(0x10FFFF)
+
+# Tiền tố có nhiều key hơn ngưỡng này thì giữ sẵn top gợi ý, không duyệt lại cả khoảng
+_TOP_SIZE = 50          # Bằng limit tối đa của /products/suggest
+_TOP_DEPTH = 2 * _TOP_SIZE  # Dư ra để xoá vài key trong top không phải tính lại ngay
+_WARM_PREFIX_LEN = 2    # Build tính sẵn top cho các tiền tố 1-2 ký tự
+
+
+def _prefix_end(prefix):
+    """
+    Chuỗi nhỏ nhất lớn hơn mọi chuỗi bắt đầu bằng `prefix`, None nếu không có
+    (prefix chỉ gồm ký tự U+10FFFF: mọi key từ vị trí của prefix trở đi đều khớp)
+    """
+    prefix = prefix.rstrip(_MAX_CHAR)
+    if not prefix:
+        return None
+    return prefix[:-1] + chr(ord(prefix[-1]) + 1)
+
+
+def _rank(needle):
+    """Thứ tự gợi ý cho `needle`: khớp chính xác trước, rồi tên ngắn hơn"""
+    exact = needle + _SEP
+    return lambda key: (not key.startswith(exact), len(key), key)
+
+
+class NameIndex:
+    """
+    Index gợi ý tên sản phẩm theo tiền tố, nằm trong bộ nhớ của mỗi worker.
+
+    Dữ liệu là một mảng key đã sắp xếp ('tên chuẩn hoá\\0id'), tra cứu tiền tố
+    bằng bisect. Index được nạp từ cursor chỉ lấy trường name, cập nhật theo
+    sự kiện ghi product trong process, và nạp lại định kỳ để thấy thay đổi
+    từ các worker khác. Tiền tố ngắn (khoảng key lớn hơn `top_min_range`) dùng
+    top gợi ý tính sẵn, được cập nhật cùng index, nên không giữ lock để duyệt
+    hàng trăm nghìn key mỗi lần gõ phím.
+    """
+
+    def __init__(self, refresh_interval=None, top_min_range=None):
+        self.refresh_interval = refresh_interval or float(os.getenv('SUGGEST_REFRESH_INTERVAL', '300'))
+        self.top_min_range = top_min_range or int(os.getenv('SUGGEST_TOP_MIN_RANGE', '1000'))
+        self._keys = None       # Mảng key đã sắp xếp
+        self._by_id = {}        # id -> (key, tên gốc)
+        self._top = {}          # tiền tố chuẩn hoá -> top _TOP_DEPTH key đã xếp hạng
+        self._pending = None    # Sự kiện đến trong lúc đang build
+        self._built_at = 0.0
+        self._lock = threading.Lock()
+        self._build_lock = threading.Lock()
+        self._refreshing = False
+
+    @staticmethod
+    def _key(product_id, name):
+        return f'{normalize(name)}{_SEP}{product_id}'
+
+    def build(self):
+        """Nạp toàn bộ tên sản phẩm (chỉ projection name) rồi thay index cũ"""
+        with self._build_lock:
+            self._build()
+
+    def _build(self):
+        with self._lock:
+            self._pending = []
+        start = time.perf_counter()
+        by_id = {}
+        try:
+            cursor = DbProduct._get_collection().find({}, {'name': 1}).batch_size(5000)
+            for doc in cursor:
+                product_id = str(doc['_id'])
+                by_id[product_id] = (self._key(product_id, doc.get('name')), doc.get('name'))
+        except Exception:
+            with self._lock:
+                self._pending = None
+            raise
+        keys = sorted(key for key, _ in by_id.values())
+        top = self._warm_top(keys)
+
+        with self._lock:
+            self._keys, self._by_id, self._top = keys, by_id, top
+            pending, self._pending = self._pending, None
+            for event_type, products in pending:
+                self._apply(event_type, products)
+            self._built_at = time.monotonic()
+        logger.info(f"Name index built: {len(keys)} products in "
+                    f"{(time.perf_counter() - start) * 1000:.0f}ms")
+
+    @staticmethod
+    def _range(keys, needle):
+        """Khoảng [start, end) các key có tiền tố needle (các key này nằm liền nhau)"""
+        start = bisect.bisect_left(keys, needle)
+        upper = _prefix_end(needle)
+        end = bisect.bisect_left(keys, upper, start) if upper is not None else len(keys)
+        return start, end
+
+    def _cacheable(self, start, end):
+        return end - start > max(self.top_min_range, _TOP_DEPTH)
+
+    @staticmethod
+    def _ranked(keys, needle, start, end, limit):
+        return heapq.nsmallest(limit, (keys[i] for i in range(start, end)), key=_rank(needle))
+
+    def _warm_top(self, keys):
+        """Top gợi ý của các tiền tố ngắn có nhiều key (tính ngoài lock, lúc build)"""
+        top = {}
+        for length in range(1, _WARM_PREFIX_LEN + 1):
+            start = 0
+            while start < len(keys):
+                needle = keys[start].split(_SEP, 1)[0][:length]
+                if len(needle) < length:
+                    start += 1  # Tên ngắn hơn tiền tố
+                    continue
+                start, end = self._range(keys, needle)
+                if self._cacheable(start, end):
+                    top[needle] = self._ranked(keys, needle, start, end, _TOP_DEPTH)
+                start = end
+        return top
+
+    def _build_quietly(self):
+        try:
+            self.build()
+        except Exception as e:
+            logger.error(f"Name index build failed: {e}")
+        finally:
+            self._refreshing = False
+
+    def warm(self):
+        """Build ở thread nền lúc khởi động, không chặn worker"""
+        threading.Thread(target=self._build_quietly, name='name-index-build', daemon=True).start()
+
+    def _refresh_in_background(self):
+        if self._refreshing:
+            return
+        self._refreshing = True
+        threading.Thread(target=self._build_quietly, name='name-index-refresh', daemon=True).start()
+
+    def suggest(self, prefix, limit=10):
+        """Top `limit` sản phẩm có tên bắt đầu bằng prefix: khớp chính xác, tên ngắn hơn xếp trước"""
+        if self._keys is None:
+            # Request đầu tiên trước khi warm() xong: chờ build (hoặc tự build)
+            with self._build_lock:
+                if self._keys is None:
+                    self._build()
+        elif time.monotonic() - self._built_at > self.refresh_interval:
+            self._refresh_in_background()
+
+        needle = normalize(prefix)
+        if not needle.strip():
+            raise ValueError('Tiền tố không hợp lệ')
+        with self._lock:
+            top = self._top.get(needle)
+            if top is None:
+                # Xếp hạng trên toàn bộ khoảng (heap giữ phần tử tốt nhất), không chỉ phần đầu.
+                # Khoảng lớn thì giữ lại top để các lần gõ sau không duyệt lại
+                keys = self._keys
+                start, end = self._range(keys, needle)
+                if self._cacheable(start, end) and limit <= _TOP_SIZE:
+                    top = self._top[needle] = self._ranked(keys, needle, start, end, _TOP_DEPTH)
+                else:
+                    top = self._ranked(keys, needle, start, end, limit)
+            ranked = top[:limit]
+            by_id = self._by_id
+            results = []
+            for key in ranked:
+                product_id = key.rsplit(_SEP, 1)[1]
+                results.append({'id': product_id, 'name': by_id[product_id][1]})
+        return results
+
+    def _cached_prefixes(self, key):
+        """Các tiền tố đang có top tính sẵn mà key thuộc về"""
+        if not self._top:
+            return
+        name = key.rsplit(_SEP, 1)[0]
+        for length in range(1, len(name) + 1):
+            needle = name[:length]
+            top = self._top.get(needle)
+            if top is not None:
+                yield needle, top
+
+    def _remove(self, product_id):
+        entry = self._by_id.pop(product_id, None)
+        if entry is None:
+            return
+        key = entry[0]
+        index = bisect.bisect_left(self._keys, key)
+        if index < len(self._keys) and self._keys[index] == key:
+            del self._keys[index]
+        for needle, top in list(self._cached_prefixes(key)):
+            if key in top:
+                top.remove(key)
+                if len(top) < _TOP_SIZE:
+                    del self._top[needle]  # Hết phần dư: tính lại ở lần suggest sau
+
+    def _insert(self, product_id, name):
+        key = self._key(product_id, name)
+        bisect.insort(self._keys, key)
+        self._by_id[product_id] = (key, name)
+        for needle, top in self._cached_prefixes(key):
+            # Top luôn là các key tốt nhất của khoảng: key mới chỉ vào nếu hơn phần tử cuối
+            rank = _rank(needle)
+            if rank(key) < rank(top[-1]):
+                top.append(key)
+                top.sort(key=rank)
+                del top[_TOP_DEPTH:]
+
+    def _apply(self, event_type, products):
+        for product in products:
+            product_id = product['id']
+            self._remove(product_id)
+            if event_type != 'product.deleted':
+                self._insert(product_id, product['name'])
+
+    def on_change(self, event_type, products):
+        """Listener của product_hooks: cập nhật index ngay trong process"""
+        with self._lock:
+            if self._pending is not None:
+                self._pending.append((event_type, products))
+            if self._keys is not None:
+                self._apply(event_type, products)
+
+    def stats(self):
+        with self._lock:
+            size = len(self._keys) if self._keys is not None else 0
+        return {'entries': size}
+
+    def init_metrics(self, metrics):
+        register_stats(metrics, 'suggest_index', self.stats,
+                       gauges={'entries': 'Số tên sản phẩm trong index gợi ý'})
+
+
+# Index dùng chung trong worker, cập nhật theo mọi lần ghi product
+name_index = NameIndex()
+on_product_change(name_index.on_change)
@@ -0,0 +1,95 @@
+import os
+import uuid
+import logging
+import datetime
+import threading
+from mongoengine.queryset.visitor import Q
+from openapi_server.db_models import OutboxEvent
+
+logger = logging.getLogger(__name__)
+
+
+class OutboxRelay:
+    """
+    Vòng lặp nền đọc OutboxEvent theo lô và giao cho `publish` để fan-out.
+
+    Mỗi lô được "claim" bằng một token, nên nhiều worker Gunicorn có thể cùng
+    chạy relay mà không gửi trùng. Lô claim quá `lease_seconds` mà chưa xong
+    (worker chết giữa chừng) sẽ được relay khác nhận lại.
+    """
+
+    def __init__(self, publish, batch_size=None, poll_interval=None, lease_seconds=None):
+        self.publish = publish  # publish(list[OutboxEvent])
+        self.batch_size = batch_size or int(os.getenv('OUTBOX_BATCH_SIZE', '100'))
+        self.poll_interval = poll_interval or float(os.getenv('OUTBOX_POLL_INTERVAL', '1'))
+        self.lease_seconds = lease_seconds or int(os.getenv('OUTBOX_LEASE_SECONDS', '60'))
+        self._wakeup = threading.Event()
+        self._lock = threading.Lock()
+        self._thread = None
+        self._pid = None
+        self._stopped = False
+
+    def start(self):
+        """Khởi động relay (lười, và khởi động lại sau khi Gunicorn fork)"""
+        with self._lock:
+            if self._pid == os.getpid() and self._thread is not None:
+                return
+            self._pid = os.getpid()
+            self._stopped = False
+            self._thread = threading.Thread(target=self._run, name='outbox-relay', daemon=True)
+            self._thread.start()
+        logger.info(f"Outbox relay started: batch={self.batch_size}, poll={self.poll_interval}s")
+
+    def stop(self, timeout=None):
+        with self._lock:
+            thread, self._thread = self._thread, None
+            self._stopped = True
+        self._wakeup.set()
+        if thread is not None:
+            thread.join(timeout)
+
+    def wake(self):
+        """Báo relay có sự kiện mới ghi từ process này, không cần chờ hết chu kỳ poll"""
+        self.start()
+        self._wakeup.set()
+
+    def _claimable(self, now):
+        stale = now - datetime.timedelta(seconds=self.lease_seconds)
+        return Q(status='pending') | (Q(status='processing') & Q(claimed_at__lt=stale))
+
+    def _claim_batch(self):
+        now = datetime.datetime.utcnow()
+        ids = list(OutboxEvent.objects(self._claimable(now))
+                   .order_by('created_at')
+                   .limit(self.batch_size)
+                   .scalar('id'))
+        if not ids:
+            return None, []
+
+        token = uuid.uuid4().hex
+        OutboxEvent.objects(Q(id__in=ids) & self._claimable(now)).update(
+            set__status='processing', set__claimed_by=token, set__claimed_at=now)
+        return token, list(OutboxEvent.objects(claimed_by=token).order_by('created_at'))
+
+    def run_once(self):
+        """Xử lý một lô. Trả về số sự kiện đã phát."""
+        token, events = self._claim_batch()
+        if not events:
+            return 0
+
+        self.publish(events)
+        OutboxEvent.objects(claimed_by=token).delete()
+        return len(events)
+
+    def _run(self):
+        while not self._stopped:
+            try:
+                processed = self.run_once()
+            except Exception as e:
+                logger.error(f"Outbox relay error: {e}", exc_info=True)
+                processed = 0
+
+            # Lô đầy thì xử lý tiếp ngay, ngược lại chờ sự kiện mới hoặc hết chu kỳ poll
+            if processed < self.batch_size:
+                self._wakeup.wait(self.poll_interval)
+                self._wakeup.clear()
@@ -0,0 +1,21 @@
+import json
+import base64
+import binascii
+
+
+def encode_cursor(values):
+    """Mã hoá các giá trị khoá keyset (vd. [id] hoặc [price, id]) thành token opaque"""
+    raw = json.dumps(values, separators=(',', ':')).encode('utf-8')
+    return base64.urlsafe_b64encode(raw).rstrip(b'=').decode('ascii')
+
+
+def decode_cursor(token, size):
+    """Giải mã token từ encode_cursor, raise ValueError nếu token sai định dạng"""
+    try:
+        padded = token + '=' * (-len(token) % 4)
+        values = json.loads(base64.urlsafe_b64decode(padded.encode('ascii')))
+    except (binascii.Error, UnicodeError, ValueError):
+        raise ValueError('Cursor không hợp lệ')
+    if not isinstance(values, list) or len(values) != size:
+        raise ValueError('Cursor không hợp lệ')
+    return values
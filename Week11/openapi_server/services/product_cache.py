@@ -0,0 +1,197 @@
+import os
+import time
+import threading
+from collections import OrderedDict
+from openapi_server.db_models import Product as DbProduct
+from openapi_server.monitoring import register_stats
+from openapi_server.services.product_hooks import on_product_change
+
+
+class LocalSharedTier:
+    """
+    Bản thay thế cục bộ cho tier cache dùng chung giữa các worker (Redis, memcached...).
+    Cùng interface get/set/delete; dữ liệu chỉ nằm trong process nên dùng cho dev/test.
+    """
+
+    def __init__(self):
+        self._entries = {}  # key -> (expires_at, value)
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            if entry[0] <= time.monotonic():
+                del self._entries[key]
+                return None
+            return entry[1]
+
+    def set(self, key, value, ttl):
+        with self._lock:
+            self._entries[key] = (time.monotonic() + ttl, value)
+
+    def delete(self, key):
+        with self._lock:
+            self._entries.pop(key, None)
+
+
+class _Flight:
+    __slots__ = ('done', 'value', 'error', 'stale')
+
+    def __init__(self):
+        self.done = threading.Event()
+        self.value = None
+        self.error = None
+        self.stale = False  # Product bị ghi trong lúc đang đọc: không đưa kết quả vào cache
+
+
+class ProductCache:
+    """
+    Cache read-through cho GET /products/{productId}, gồm hai tầng:
+      - tầng 1: LRU + TTL trong process
+      - tầng 2 (tuỳ chọn): cache dùng chung giữa các worker, interface như LocalSharedTier
+    Nhiều request cùng id bị miss cùng lúc được gộp lại (single-flight): chỉ request
+    đầu tiên đọc Mongo, các request còn lại chờ và dùng chung kết quả.
+
+    Ghi product trong process xoá entry ở cả hai tầng (listener của product_hooks);
+    tầng 1 ở worker khác có thể cũ tối đa `ttl` giây.
+    """
+
+    def __init__(self, load, shared=None, max_entries=None, ttl=None, shared_ttl=None):
+        self.load = load        # load(product_id) -> (dict, version) hoặc None nếu không tồn tại
+        self.shared = shared
+        self.max_entries = max_entries or int(os.getenv('PRODUCT_CACHE_SIZE', '10000'))
+        self.ttl = ttl if ttl is not None else float(os.getenv('PRODUCT_CACHE_TTL', '5'))
+        self.shared_ttl = shared_ttl if shared_ttl is not None else float(os.getenv('PRODUCT_CACHE_SHARED_TTL', '60'))
+        self._entries = OrderedDict()  # product id -> (expires_at, value)
+        self._flights = {}
+        self._lock = threading.Lock()
+        self._counts = {
+            'hits': 0,
+            'shared_hits': 0,
+            'misses': 0,
+            'coalesced': 0,
+            'invalidations': 0,
+        }
+
+    def get(self, product_id):
+        """Trả về (dict, version) của product, hoặc None nếu không tồn tại"""
+        with self._lock:
+            entry = self._entries.get(product_id)
+            if entry is not None:
+                if entry[0] > time.monotonic():
+                    self._entries.move_to_end(product_id)
+                    self._counts['hits'] += 1
+                    return entry[1]
+                del self._entries[product_id]
+
+            flight = self._flights.get(product_id)
+            leader = flight is None
+            if leader:
+                flight = self._flights[product_id] = _Flight()
+                self._counts['misses'] += 1
+            else:
+                self._counts['coalesced'] += 1
+
+        if not leader:
+            flight.done.wait()
+            if flight.error is not None:
+                raise flight.error
+            return flight.value
+
+        loaded = False  # True nếu giá trị đọc từ Mongo (cần ghi lên tầng dùng chung)
+        try:
+            value, loaded = self._load(product_id)
+            flight.value = value
+        except Exception as e:
+            flight.error = e
+            raise
+        finally:
+            with self._lock:
+                fresh = flight.error is None and flight.value is not None and not flight.stale
+                if fresh:
+                    self._store(product_id, flight.value)
+            if fresh and loaded and self.shared is not None:
+                # Ghi tầng dùng chung ngoài lock, flight vẫn đăng ký nên invalidate() chen vào
+                # lúc này vẫn đánh dấu được stale; khi đó xoá lại để bản cũ không ở lại cho mọi process
+                self.shared.set(product_id, flight.value, self.shared_ttl)
+            with self._lock:
+                del self._flights[product_id]
+                stale_shared = fresh and loaded and flight.stale
+            if stale_shared and self.shared is not None:
+                self.shared.delete(product_id)
+            flight.done.set()
+        return value
+
+    def _load(self, product_id):
+        """(giá trị, True nếu phải đọc từ Mongo)"""
+        if self.shared is not None:
+            value = self.shared.get(product_id)
+            if value is not None:
+                with self._lock:
+                    self._counts['shared_hits'] += 1
+                return value, False
+        return self.load(product_id), True
+
+    def _store(self, product_id, value):
+        self._entries[product_id] = (time.monotonic() + self.ttl, value)
+        self._entries.move_to_end(product_id)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+    def invalidate(self, event_type, products):
+        """Listener của product_hooks: xoá entry của các product vừa bị ghi"""
+        for product in products:
+            product_id = product['id']
+            with self._lock:
+                self._entries.pop(product_id, None)
+                flight = self._flights.get(product_id)
+                if flight is not None:
+                    flight.stale = True
+                self._counts['invalidations'] += 1
+            if self.shared is not None:
+                self.shared.delete(product_id)
+
+    def stats(self):
+        with self._lock:
+            stats = dict(self._counts)
+            stats['entries'] = len(self._entries)
+        lookups = stats['hits'] + stats['misses'] + stats['coalesced']
+        stats['hit_ratio'] = (stats['hits'] + stats['shared_hits']) / lookups if lookups else 0.0
+        return stats
+
+    def init_metrics(self, metrics):
+        register_stats(
+            metrics, 'product_cache', self.stats,
+            counters={
+                'hits': 'Số lần đọc product trả về từ cache trong process',
+                'shared_hits': 'Số lần đọc product trả về từ cache dùng chung',
+                'misses': 'Số lần đọc product phải truy vấn (sau khi gộp)',
+                'coalesced': 'Số request chờ dùng chung kết quả của một lần đọc đang chạy',
+                'invalidations': 'Số entry bị xoá do product thay đổi',
+            },
+            gauges={
+                'entries': 'Số product đang nằm trong cache',
+                'hit_ratio': 'Tỉ lệ đọc product trả về từ cache (hai tầng)',
+            })
+
+
+def _load_product(product_id):
+    doc = DbProduct.objects(id=product_id).exclude('name_grams').as_pymongo().first()
+    if doc is None:
+        return None
+    return DbProduct.raw_to_dict(doc), doc.get('version', 1)
+
+
+def _shared_tier():
+    # PRODUCT_CACHE_SHARED=local bật tầng 2 bằng bản thay thế trong process
+    backend = os.getenv('PRODUCT_CACHE_SHARED', '')
+    if backend == 'local':
+        return LocalSharedTier()
+    return None
+
+
+# Cache dùng chung trong worker, vô hiệu hoá theo mọi lần ghi product
+product_cache = ProductCache(load=_load_product, shared=_shared_tier())
+on_product_change(product_cache.invalidate)
@@ -0,0 +1,24 @@
+import logging
+
+logger = logging.getLogger(__name__)
+
+# Các cache/index trong process đăng ký ở đây để được báo khi product thay đổi
+_listeners = []
+
+
+def on_product_change(listener):
+    """Đăng ký listener(event_type, products); dùng được như decorator"""
+    _listeners.append(listener)
+    return listener
+
+
+def product_changed(event_type, products):
+    """
+    Gọi từ controller sau mỗi lần ghi product thành công.
+    `products` là danh sách dict dạng Product.to_dict() (với delete: trạng thái trước khi xoá).
+    """
+    for listener in _listeners:
+        try:
+            listener(event_type, products)
+        except Exception as e:
+            logger.error(f"Product change listener failed: {e}", exc_info=True)
@@ -0,0 +1,50 @@
+from bson import ObjectId
+from openapi_server.db_models import Product as DbProduct
+
+# Các trường trả về cho client (ngoài id); name_grams/version/created_at là dữ liệu nội bộ
+PRODUCT_FIELDS = ('name', 'price', 'description')
+
+
+def to_items(docs, fields=PRODUCT_FIELDS):
+    """
+    Chuyển document thô (as_pymongo) sang dạng response trong một lượt:
+    _id -> id (chuỗi), chỉ giữ `fields`, trường thiếu trả về None như Product.to_dict().
+    """
+    if fields == PRODUCT_FIELDS:
+        # Đủ trường: dùng chung DbProduct.raw_to_dict với các đường đọc/ghi khác
+        raw_to_dict = DbProduct.raw_to_dict
+        return [raw_to_dict(doc) for doc in docs]
+    items = []
+    append = items.append
+    for doc in docs:
+        item = {'id': str(doc['_id'])}
+        for field in fields:
+            item[field] = doc.get(field)
+        append(item)
+    return items
+
+
+def raw_query(fields=PRODUCT_FIELDS, **filters):
+    """QuerySet chỉ lấy `fields` (+ _id) và trả về dict thô, không dựng Document"""
+    return DbProduct.objects(**filters).only(*fields).as_pymongo()
+
+
+def list_page(limit, after_id=None):
+    """Một trang sản phẩm theo _id tăng dần. Trả về (items, còn trang sau hay không)."""
+    query = raw_query()
+    if after_id is not None:
+        query = query.filter(id__gt=after_id)
+    docs = list(query.order_by('id').limit(limit + 1))
+    return to_items(docs[:limit]), len(docs) > limit
+
+
+def list_all():
+    return to_items(raw_query())
+
+
+def get_many(ids):
+    """Các sản phẩm có id trong `ids` (một truy vấn $in), dạng {id: item}"""
+    valid = list({product_id for product_id in ids if ObjectId.is_valid(product_id)})
+    if not valid:
+        return {}
+    return {item['id']: item for item in to_items(raw_query(id__in=valid))}
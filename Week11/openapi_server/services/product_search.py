@@ -0,0 +1,153 @@
+import os
+import re
+import logging
+from bson import ObjectId
+from pymongo import UpdateOne
+from pymongo.errors import OperationFailure
+from openapi_server.db_models import Product as DbProduct
+from openapi_server.services.text_tokens import name_grams, query_grams
+from openapi_server.services.pagination import encode_cursor, decode_cursor
+from openapi_server.services.product_hooks import on_product_change
+from openapi_server.services.search_cache import SearchCache
+from openapi_server.services.product_reads import to_items
+from openapi_server.services.index_manager import has_index
+
+logger = logging.getLogger(__name__)
+
+# Index khai báo trong Product.meta, dùng làm hint cho từng access path
+NAME_GRAMS_INDEX = [('name_grams', 1)]
+PRICE_INDEX = [('price', 1), ('_id', 1)]
+NAME_INDEX = [('name', 1), ('_id', 1)]
+
+# Từ độ dài này trở lên, index n-gram đủ chọn lọc để ưu tiên hơn khoảng giá
+SELECTIVE_TERM_LENGTH = 3
+
+# Giới hạn cứng số kết quả của một lần tìm kiếm
+DEFAULT_RESULTS = 50
+MAX_RESULTS = int(os.getenv('SEARCH_MAX_RESULTS', '200'))
+
+SORT_FIELDS = {'name': NAME_INDEX, 'price': PRICE_INDEX}
+# Kiểu hợp lệ của giá trị sort trong cursor (so đúng type: bool hay dict như {"$ne": null} bị từ chối)
+CURSOR_VALUE_TYPES = {'name': (str,), 'price': (int, float)}
+PROJECTABLE_FIELDS = ('name', 'price', 'description')
+
+# Cache kết quả tìm kiếm, bị vô hiệu hoá mỗi khi có product được ghi
+search_cache = SearchCache()
+on_product_change(search_cache.invalidate)
+
+
+def build_search_query(criteria):
+    """
+    Dựng query tìm kiếm và chọn access path theo tiêu chí:
+      - name_contains (>= 2 ký tự): lọc ứng viên bằng index n-gram ($all),
+        sau đó regex không phân biệt hoa thường chỉ chạy trên các ứng viên đó
+      - min_price / max_price: range scan trên index price
+      - chỉ có sort: đọc theo thứ tự của index name/price
+      - name_contains 1 ký tự và không có khoảng giá: đành quét collection
+    Trả về (raw filter, hint, tên access path).
+    """
+    raw = {}
+    term = criteria.get('name_contains')
+    grams = query_grams(term) if term else []
+
+    if term:
+        raw['name'] = {'$regex': re.escape(term), '$options': 'i'}
+    if grams:
+        raw['name_grams'] = {'$all': grams}
+
+    price = {}
+    if 'min_price' in criteria:
+        price['$gte'] = criteria['min_price']
+    if 'max_price' in criteria:
+        price['$lte'] = criteria['max_price']
+    if price:
+        raw['price'] = price
+
+    sort_field = (criteria.get('sort') or '').lstrip('-')
+    if grams and (not price or len(term) >= SELECTIVE_TERM_LENGTH):
+        return raw, NAME_GRAMS_INDEX, 'name_grams'
+    if price:
+        return raw, PRICE_INDEX, 'price'
+    if not term and sort_field:
+        return raw, SORT_FIELDS[sort_field], f'{sort_field}_order'
+    return raw, None, 'collection_scan' if term else 'id_order'
+
+
+def _keyset_filter(sort_field, descending, cursor):
+    """Điều kiện "sau cursor" ổn định theo (sort_field, _id)"""
+    op = '$lt' if descending else '$gt'
+    if not sort_field:
+        (last_id,) = cursor
+        return {'_id': {op: ObjectId(last_id)}}
+    last_value, last_id = cursor
+    return {'$or': [
+        {sort_field: {op: last_value}},
+        {sort_field: last_value, '_id': {op: ObjectId(last_id)}}
+    ]}
+
+
+def search_page(criteria):
+    """
+    Thực hiện tìm kiếm với sort, phân trang keyset và projection.
+    Trả về (items, next_after, access_path); raise ValueError nếu cursor sai.
+    """
+    raw, hint, access_path = build_search_query(criteria)
+
+    sort = criteria.get('sort') or ''
+    sort_field, descending = sort.lstrip('-'), sort.startswith('-')
+    after = criteria.get('after')
+    if after:
+        cursor = decode_cursor(after, 2 if sort_field else 1)
+        if not ObjectId.is_valid(cursor[-1]):
+            raise ValueError('Cursor không hợp lệ')
+        # Giá trị sort đi thẳng vào query: chỉ nhận đúng kiểu của trường, không nhận toán tử Mongo
+        if sort_field and type(cursor[0]) not in CURSOR_VALUE_TYPES[sort_field]:
+            raise ValueError('Cursor không hợp lệ')
+        raw = {'$and': [raw, _keyset_filter(sort_field, descending, cursor)]}
+
+    direction = '-' if descending else '+'
+    order = [f'{direction}{sort_field}', f'{direction}id'] if sort_field else [f'{direction}id']
+    limit = min(criteria.get('limit', DEFAULT_RESULTS), MAX_RESULTS)
+
+    # Projection đẩy xuống Mongo; luôn cần thêm trường sort để tạo cursor
+    fields = [f for f in (criteria.get('fields') or PROJECTABLE_FIELDS) if f in PROJECTABLE_FIELDS]
+    loaded = set(fields) | ({sort_field} if sort_field else set())
+
+    query = DbProduct.objects(__raw__=raw).only(*loaded).order_by(*order).limit(limit + 1)
+
+    # Document thô, không dựng Document: map thẳng sang dạng response.
+    # Chỉ hint khi index_manager đã thấy index tồn tại; Mongo từ chối hint tới index
+    # không có (vd. index vừa bị xoá) thì chạy lại không hint
+    docs = None
+    if hint and has_index(DbProduct, hint):
+        try:
+            docs = list(query.hint(hint).as_pymongo())
+        except OperationFailure as e:
+            logger.warning(f"Hint {hint} bị từ chối, tìm kiếm không hint: {e}")
+    if docs is None:
+        docs = list(query.as_pymongo())
+    next_after = None
+    if len(docs) > limit:
+        docs = docs[:limit]
+        last = docs[-1]
+        keys = [last.get(sort_field), str(last['_id'])] if sort_field else [str(last['_id'])]
+        next_after = encode_cursor(keys)
+
+    return to_items(docs, tuple(fields)), next_after, access_path
+
+
+def backfill_name_grams(batch_size=1000):
+    """Tính name_grams cho các sản phẩm tạo trước khi có index n-gram"""
+    collection = DbProduct._get_collection()
+    cursor = collection.find({'name_grams': {'$exists': False}}, {'name': 1}).batch_size(batch_size)
+    updated, ops = 0, []
+    for doc in cursor:
+        ops.append(UpdateOne({'_id': doc['_id']}, {'$set': {'name_grams': name_grams(doc.get('name'))}}))
+        if len(ops) >= batch_size:
+            updated += collection.bulk_write(ops, ordered=False).modified_count
+            ops = []
+    if ops:
+        updated += collection.bulk_write(ops, ordered=False).modified_count
+    if updated:
+        logger.info(f"Đã backfill name_grams cho {updated} sản phẩm")
+    return updated
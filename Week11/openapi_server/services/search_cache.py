@@ -0,0 +1,100 @@
+import os
+import json
+import time
+import threading
+from collections import OrderedDict
+from openapi_server.monitoring import register_stats
+
+
+class SearchCache:
+    """
+    Cache LRU + TTL cho kết quả POST /products/search, key là criteria đã chuẩn hoá.
+
+    Invalidation dùng generation counter: mỗi lần product thay đổi chỉ tăng
+    generation (O(1)); entry thuộc generation cũ coi như miss và bị xoá khi
+    được chạm tới hoặc bị đẩy ra theo LRU. Cache nằm trong từng process,
+    nên dữ liệu ở worker khác cũ tối đa `ttl` giây.
+    """
+
+    def __init__(self, max_entries=None, ttl=None):
+        self.max_entries = max_entries or int(os.getenv('SEARCH_CACHE_SIZE', '1000'))
+        self.ttl = ttl if ttl is not None else float(os.getenv('SEARCH_CACHE_TTL', '10'))
+        self._entries = OrderedDict()  # key -> (generation, expires_at, value)
+        self._generation = 0
+        self._lock = threading.Lock()
+        self._counts = {
+            'hits': 0,
+            'misses': 0,
+            'evictions': 0,
+            'invalidations': 0,
+        }
+
+    @staticmethod
+    def key(criteria):
+        """Chuẩn hoá criteria: sort key, name_contains chữ thường, giá dạng float"""
+        canonical = dict(criteria)
+        if 'name_contains' in canonical:
+            canonical['name_contains'] = canonical['name_contains'].lower()
+        for field in ('min_price', 'max_price'):
+            if field in canonical:
+                canonical[field] = float(canonical[field])
+        if canonical.get('fields'):
+            canonical['fields'] = sorted(set(canonical['fields']))
+        return json.dumps(canonical, sort_keys=True, separators=(',', ':'), ensure_ascii=False)
+
+    def get(self, key):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                generation, expires_at, value = entry
+                if generation == self._generation and expires_at > time.monotonic():
+                    self._entries.move_to_end(key)
+                    self._counts['hits'] += 1
+                    return value
+                del self._entries[key]
+            self._counts['misses'] += 1
+            return None
+
+    def generation(self):
+        """Generation hiện tại; đọc trước khi truy vấn Mongo rồi truyền lại cho put()"""
+        with self._lock:
+            return self._generation
+
+    def put(self, key, value, generation=None):
+        """
+        Lưu kết quả. `generation` là giá trị generation() lấy trước khi đọc Mongo: nếu đã
+        có invalidate() xảy ra trong lúc đọc thì kết quả có thể cũ, không lưu.
+        """
+        with self._lock:
+            if generation is not None and generation != self._generation:
+                return
+            self._entries[key] = (self._generation, time.monotonic() + self.ttl, value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                self._counts['evictions'] += 1
+
+    def invalidate(self, *args):
+        """Vô hiệu hoá toàn bộ cache bằng cách tăng generation (listener của product_hooks)"""
+        with self._lock:
+            self._generation += 1
+            self._counts['invalidations'] += 1
+
+    def stats(self):
+        with self._lock:
+            stats = dict(self._counts)
+            stats['entries'] = len(self._entries)
+        return stats
+
+    def init_metrics(self, metrics):
+        register_stats(
+            metrics, 'search_cache', self.stats,
+            counters={
+                'hits': 'Số lần tìm kiếm trả về từ cache',
+                'misses': 'Số lần tìm kiếm phải truy vấn Mongo',
+                'evictions': 'Số entry bị đẩy ra do đầy cache (LRU)',
+                'invalidations': 'Số lần cache bị vô hiệu hoá do product thay đổi',
+            },
+            gauges={
+                'entries': 'Số entry đang nằm trong cache',
+            })
@@ -0,0 +1,80 @@
+import os
+import time
+import logging
+import threading
+from fnmatch import fnmatchcase
+from openapi_server.db_models import Webhook, Counter
+
+logger = logging.getLogger(__name__)
+
+VERSION_KEY = 'webhooks'
+
+
+class SubscriberIndex:
+    """
+    Index trong bộ nhớ: event_type -> danh sách Webhook đăng ký, hỗ trợ
+    cả pattern wildcard như 'product.*'.
+
+    Index được nạp lười ở lần tra cứu đầu tiên. Khi có webhook mới, process
+    ghi sẽ xoá index của mình và tăng Counter 'webhooks'; các worker khác
+    so sánh version này (tối đa mỗi `check_interval` giây) để nạp lại.
+    """
+
+    def __init__(self, check_interval=None):
+        if check_interval is None:
+            check_interval = float(os.getenv('WEBHOOK_INDEX_CHECK_INTERVAL', '5'))
+        self.check_interval = check_interval
+        self._lock = threading.Lock()
+        self._exact = None      # {event_type: [Webhook]}
+        self._patterns = []     # [(pattern, Webhook)]
+        self._resolved = {}     # Cache kết quả đã ghép wildcard theo event_type
+        self._version = None
+        self._checked_at = 0.0
+
+    def _load(self):
+        version = Counter.current(VERSION_KEY)
+        exact, patterns = {}, []
+        for sub in Webhook.objects:
+            for event in sub.events:
+                if '*' in event or '?' in event:
+                    patterns.append((event, sub))
+                else:
+                    exact.setdefault(event, []).append(sub)
+
+        self._exact, self._patterns, self._resolved = exact, patterns, {}
+        self._version = version
+        self._checked_at = time.monotonic()
+        logger.info(f"Subscriber index loaded (version {version}, "
+                    f"{len(exact)} event types, {len(patterns)} patterns)")
+
+    def _ensure_fresh(self):
+        if self._exact is None:
+            self._load()
+            return
+        if time.monotonic() - self._checked_at < self.check_interval:
+            return
+        self._checked_at = time.monotonic()
+        if Counter.current(VERSION_KEY) != self._version:
+            self._load()
+
+    def subscribers_for(self, event_type):
+        """Trả về các Webhook nhận event_type (không trùng lặp)"""
+        with self._lock:
+            self._ensure_fresh()
+            resolved = self._resolved.get(event_type)
+            if resolved is None:
+                seen, resolved = set(), []
+                candidates = self._exact.get(event_type, []) + [
+                    sub for pattern, sub in self._patterns if fnmatchcase(event_type, pattern)]
+                for sub in candidates:
+                    if sub.id not in seen:
+                        seen.add(sub.id)
+                        resolved.append(sub)
+                self._resolved[event_type] = resolved
+            return resolved
+
+    def invalidate(self):
+        """Gọi sau khi ghi Webhook: xoá index cục bộ và báo các worker khác"""
+        Counter.bump(VERSION_KEY)
+        with self._lock:
+            self._exact = None
@@ -0,0 +1,32 @@
+import unicodedata
+
+# Độ dài n-gram được đánh index cho tìm kiếm chuỗi con trên tên sản phẩm
+GRAM_SIZES = (2, 3)
+
+
+def normalize(text):
+    """Chữ thường, bỏ dấu (vd. 'Bàn phím Đỏ' -> 'ban phim do') để so khớp không phân biệt dấu"""
+    decomposed = unicodedata.normalize('NFD', text or '')
+    stripped = ''.join(c for c in decomposed if not unicodedata.combining(c))
+    return stripped.replace('đ', 'd').replace('Đ', 'D').lower()
+
+
+def name_grams(name):
+    """Tập bigram + trigram của tên đã chuẩn hoá, lưu vào Product.name_grams"""
+    text = normalize(name)
+    grams = set()
+    for size in GRAM_SIZES:
+        grams.update(text[i:i + size] for i in range(len(text) - size + 1))
+    return sorted(grams)
+
+
+def query_grams(term):
+    """
+    Các gram mà mọi tên chứa `term` chắc chắn phải có.
+    Trả về [] khi term quá ngắn (1 ký tự) để dùng được index.
+    """
+    text = normalize(term)
+    if len(text) < min(GRAM_SIZES):
+        return []
+    size = max(s for s in GRAM_SIZES if s <= len(text))
+    return sorted({text[i:i + size] for i in range(len(text) - size + 1)})
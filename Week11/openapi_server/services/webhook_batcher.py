@@ -0,0 +1,134 @@
+import os
+import time
+import logging
+import threading
+
+logger = logging.getLogger(__name__)
+
+
+class _Buffer:
+    __slots__ = ('sub', 'bodies', 'first_at', 'timer_armed', 'in_flight_since')
+
+    def __init__(self, sub):
+        self.sub = sub
+        self.bodies = []
+        self.first_at = None
+        self.timer_armed = False
+        self.in_flight_since = None
+
+
+class WebhookBatcher:
+    """
+    Gom sự kiện cho các subscriber bật chế độ batch (Webhook.batch_size).
+    Mỗi lô được gửi khi đủ `batch_size` sự kiện hoặc sự kiện đầu tiên đã chờ
+    `batch_window_ms`, dưới dạng một mảng JSON được ký như request thường.
+
+    Mỗi subscriber chỉ có tối đa một lô đang gửi: lô sau chỉ được gửi khi
+    DeliveryScheduler báo lô trước đã xong (thành công hoặc vào dead letter),
+    nhờ vậy thứ tự sự kiện của từng subscriber được giữ nguyên.
+    """
+
+    def __init__(self, submit, timers, sign, in_flight_timeout=None):
+        self.submit = submit    # dispatcher.submit(job, block)
+        self.timers = timers    # RetryScheduler dùng làm bộ hẹn giờ
+        self.sign = sign        # sign(secret, body) -> headers
+        if in_flight_timeout is None:
+            in_flight_timeout = float(os.getenv('WEBHOOK_BATCH_INFLIGHT_TIMEOUT', '300'))
+        self.in_flight_timeout = in_flight_timeout
+        self._buffers = {}
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def _window(sub):
+        return (sub.batch_window_ms or 1000) / 1000.0
+
+    def add(self, sub, body, block=True):
+        """
+        Thêm một sự kiện (bytes JSON đã serialise) vào lô của subscriber.
+        block=False khi gọi từ luồng hẹn giờ: lô đầy không được chờ hàng đợi dispatcher.
+        """
+        key = str(sub.id)
+        with self._lock:
+            buf = self._buffers.get(key)
+            if buf is None:
+                buf = self._buffers[key] = _Buffer(sub)
+            buf.sub = sub  # Luôn dùng cấu hình mới nhất từ subscriber index
+            buf.bodies.append(body)
+            if buf.first_at is None:
+                buf.first_at = time.monotonic()
+            full = len(buf.bodies) >= sub.batch_size
+            arm = not full and not buf.timer_armed
+            if arm:
+                buf.timer_armed = True
+
+        if full:
+            self._flush(key, block=block)
+        elif arm:
+            self.timers.call_later(self._window(sub), self._flush, key, True)
+
+    def _flush(self, key, from_timer=False, block=False):
+        with self._lock:
+            buf = self._buffers.get(key)
+            if buf is None:
+                return
+            if from_timer:
+                buf.timer_armed = False
+            if not buf.bodies or self._in_flight(buf):
+                return
+            # Không vượt batch_size kể cả khi buffer đã dồn thêm trong lúc lô trước đang gửi;
+            # phần còn lại chờ on_complete của lô này
+            size = buf.sub.batch_size
+            bodies, buf.bodies = buf.bodies[:size], buf.bodies[size:]
+            if not buf.bodies:
+                buf.first_at = None
+            buf.in_flight_since = time.monotonic()
+            sub = buf.sub
+
+        body = b'[' + b','.join(bodies) + b']'
+        logger.info(f"Triggering batched webhook ({len(bodies)} events) for {sub.url}")
+        # Chỉ luồng fan-out được chờ hàng đợi; luồng hẹn giờ và worker (on_complete) thì không
+        self.submit({
+            'url': sub.url,
+            'subscriber': key,
+            'event': 'batch',
+            'body': body,
+            'headers': self.sign(sub.secret, body),
+            'attempt': 0,
+            'batched': True
+        }, block=block)
+
+    def _in_flight(self, buf):
+        if buf.in_flight_since is None:
+            return False
+        if time.monotonic() - buf.in_flight_since > self.in_flight_timeout:
+            # Job có thể đã bị spill sang process khác: không chặn subscriber mãi mãi
+            buf.in_flight_since = None
+            return False
+        return True
+
+    def on_complete(self, job):
+        """
+        Callback của DeliveryScheduler khi một job kết thúc (không còn retry),
+        và của dispatcher khi job bị bỏ do backpressure
+        """
+        if not job.get('batched'):
+            return
+        key = job['subscriber']
+        with self._lock:
+            buf = self._buffers.get(key)
+            if buf is None:
+                return
+            buf.in_flight_since = None
+            if not buf.bodies:
+                return
+            waited = time.monotonic() - buf.first_at
+            ready = len(buf.bodies) >= buf.sub.batch_size or waited >= self._window(buf.sub)
+            arm = not ready and not buf.timer_armed
+            if arm:
+                buf.timer_armed = True
+            delay = self._window(buf.sub) - waited
+
+        if ready:
+            self._flush(key)
+        elif arm:
+            self.timers.call_later(delay, self._flush, key, True)
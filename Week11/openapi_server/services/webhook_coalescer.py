@@ -0,0 +1,107 @@
+import logging
+import threading
+from collections import OrderedDict
+from openapi_server.monitoring import register_stats
+
+logger = logging.getLogger(__name__)
+
+
+class _Entry:
+    __slots__ = ('payload', 'events')
+
+    def __init__(self, payload):
+        self.payload = payload
+        self.events = 1  # Số sự kiện gốc đã gộp vào entry này
+
+
+class WebhookCoalescer:
+    """
+    Gộp sự kiện product cho subscriber bật chế độ coalesce (Webhook.coalesce_window_ms).
+    Trong một cửa sổ, mỗi product id chỉ giữ trạng thái mới nhất:
+      - created rồi updated  -> created với dữ liệu mới nhất
+      - updated rồi deleted  -> deleted
+      - created rồi deleted  -> bỏ cả hai, subscriber không nhận gì
+    Payload gửi đi có thêm 'coalesced_events': số sự kiện gốc đã được gộp.
+    """
+
+    def __init__(self, deliver, timers):
+        self.deliver = deliver  # deliver(sub, payload): định tuyến sang batch hoặc gửi đơn
+        self.timers = timers
+        self._buffers = {}      # subscriber id -> (sub, OrderedDict[product id -> _Entry])
+        self._lock = threading.Lock()
+        self._counts = {
+            'received': 0,
+            'merged': 0,
+            'cancelled': 0,
+            'flushed': 0,
+        }
+
+    @staticmethod
+    def _merge(entry, payload):
+        previous = entry.payload['event']
+        entry.events += 1
+        if previous == 'product.created' and payload['event'] == 'product.updated':
+            # Subscriber chưa biết product này: vẫn là 'created', chỉ cập nhật dữ liệu
+            entry.payload = dict(payload, event='product.created')
+        else:
+            entry.payload = payload
+
+    def add(self, sub, payload):
+        key = str(sub.id)
+        product_id = (payload.get('data') or {}).get('id')
+        with self._lock:
+            self._counts['received'] += 1
+            buffered = self._buffers.get(key)
+            start_window = buffered is None
+            if start_window:
+                buffered = self._buffers[key] = (sub, OrderedDict())
+            entries = buffered[1]
+
+            # Sự kiện không gắn với một product (vd. sự kiện tổng hợp) thì không gộp
+            slot = product_id if product_id is not None else object()
+            entry = entries.get(slot)
+            if entry is None:
+                entries[slot] = _Entry(payload)
+            elif entry.payload['event'] == 'product.created' and payload['event'] == 'product.deleted':
+                del entries[slot]
+                self._counts['cancelled'] += entry.events + 1
+            else:
+                self._merge(entry, payload)
+                entries.move_to_end(slot)
+                self._counts['merged'] += 1
+
+        if start_window:
+            self.timers.call_later(sub.coalesce_window_ms / 1000.0, self._flush, key)
+
+    def _flush(self, key):
+        with self._lock:
+            buffered = self._buffers.pop(key, None)
+        if buffered is None:
+            return
+        sub, entries = buffered
+        for entry in entries.values():
+            payload = dict(entry.payload, coalesced_events=entry.events)
+            self.deliver(sub, payload)
+        with self._lock:
+            self._counts['flushed'] += len(entries)
+        if entries:
+            logger.info(f"Coalesced webhooks flushed for {sub.url}: {len(entries)} notifications")
+
+    def stats(self):
+        with self._lock:
+            stats = dict(self._counts)
+            stats['buffered'] = sum(len(entries) for _, entries in self._buffers.values())
+        return stats
+
+    def init_metrics(self, metrics):
+        register_stats(
+            metrics, 'webhook_coalesce', self.stats,
+            counters={
+                'received': 'Số sự kiện đi vào bộ gộp',
+                'merged': 'Số sự kiện bị gộp vào trạng thái mới hơn',
+                'cancelled': 'Số sự kiện bị huỷ do cặp created/deleted',
+                'flushed': 'Số thông báo gửi đi sau khi gộp',
+            },
+            gauges={
+                'buffered': 'Số thông báo đang chờ hết cửa sổ gộp',
+            })
@@ -0,0 +1,238 @@
+import os
+import queue
+import logging
+import threading
+from openapi_server.db_models import WebhookSpill
+from openapi_server.monitoring import register_stats
+
+logger = logging.getLogger(__name__)
+
+BACKPRESSURE_POLICIES = ('block', 'drop_oldest', 'spill')
+
+_STOP = object()  # Tín hiệu dừng worker
+
+
+class WebhookDispatcher:
+    """
+    Gửi webhook bằng một pool worker cố định và hàng đợi in-memory có giới hạn,
+    thay cho việc tạo một Thread mới cho mỗi subscriber trên mỗi sự kiện.
+
+    Khi hàng đợi đầy, hành vi phụ thuộc vào `backpressure`:
+      - 'block': chờ tối đa `block_timeout` giây, hết thời gian thì bỏ job
+      - 'drop_oldest': bỏ job cũ nhất để nhường chỗ cho job mới
+      - 'spill': ghi job xuống MongoDB, worker nạp lại khi hàng đợi rảnh
+    """
+
+    def __init__(self, handler, workers=None, queue_size=None,
+                 backpressure=None, block_timeout=None):
+        self.handler = handler
+        self.workers = workers or int(os.getenv('WEBHOOK_WORKERS', '8'))
+        self.queue_size = queue_size or int(os.getenv('WEBHOOK_QUEUE_SIZE', '1000'))
+        self.backpressure = backpressure or os.getenv('WEBHOOK_BACKPRESSURE', 'block')
+        if block_timeout is None:
+            block_timeout = float(os.getenv('WEBHOOK_BLOCK_TIMEOUT', '5'))
+        self.block_timeout = block_timeout
+
+        if self.backpressure not in BACKPRESSURE_POLICIES:
+            raise ValueError(f"backpressure không hợp lệ: {self.backpressure} "
+                             f"(chọn một trong {BACKPRESSURE_POLICIES})")
+
+        self._queue = queue.Queue(maxsize=self.queue_size)
+        self._lock = threading.Lock()
+        self._refill_lock = threading.Lock()
+        self._threads = []
+        self._pid = None
+        self._busy = 0
+        self._counts = {
+            'submitted': 0,
+            'completed': 0,
+            'failed': 0,
+            'dropped': 0,
+            'spilled': 0,
+        }
+        self.on_drop = None  # Callback khi một job bị bỏ do backpressure (job không được gửi)
+        # Với 'spill', có thể còn job tồn từ lần chạy trước nằm trong Mongo
+        self._spill_pending = self.backpressure == 'spill'
+
+    # --- Vòng đời ---
+    def start(self):
+        """Khởi động worker (lười, và khởi động lại sau khi Gunicorn fork)"""
+        with self._lock:
+            if self._pid == os.getpid() and self._threads:
+                return
+            self._pid = os.getpid()
+            self._threads = [
+                threading.Thread(target=self._run, name=f'webhook-worker-{i}', daemon=True)
+                for i in range(self.workers)
+            ]
+            for thread in self._threads:
+                thread.start()
+        logger.info(f"Webhook dispatcher started: {self.workers} workers, "
+                    f"queue={self.queue_size}, backpressure={self.backpressure}")
+
+    def stop(self, timeout=None):
+        """Dừng toàn bộ worker sau khi xử lý hết các job đang chờ"""
+        with self._lock:
+            threads, self._threads = self._threads, []
+        for _ in threads:
+            self._queue.put(_STOP)
+        for thread in threads:
+            thread.join(timeout)
+
+    # --- Nhận job ---
+    def submit(self, job, block=True):
+        """
+        Đưa một job vào hàng đợi. Job là dict có thể lưu xuống Mongo
+        (khi spill). Trả về False nếu job bị bỏ do backpressure.
+        block=False (luồng hẹn giờ, worker): với 'block' không chờ chỗ trống mà bỏ job ngay.
+        """
+        self.start()
+        self._incr('submitted')
+
+        if self.backpressure == 'drop_oldest':
+            dropped = []
+            while True:
+                try:
+                    self._queue.put_nowait(job)
+                    break
+                except queue.Full:
+                    try:
+                        dropped.append(self._queue.get_nowait())
+                        self._queue.task_done()
+                        self._incr('dropped')
+                    except queue.Empty:
+                        pass
+            for dropped_job in dropped:
+                self._dropped(dropped_job)
+            return True
+
+        if self.backpressure == 'spill':
+            try:
+                self._queue.put_nowait(job)
+                return True
+            except queue.Full:
+                return self._spill(job)
+
+        try:
+            if block:
+                self._queue.put(job, timeout=self.block_timeout)
+            else:
+                self._queue.put_nowait(job)
+            return True
+        except queue.Full:
+            self._incr('dropped')
+            waited = f" after {self.block_timeout}s" if block else ""
+            logger.warning(f"Webhook queue full{waited}, dropping job")
+            self._dropped(job)
+            return False
+
+    def _dropped(self, job):
+        if self.on_drop is None or job is _STOP:
+            return
+        try:
+            self.on_drop(job)
+        except Exception as e:
+            logger.error(f"Webhook drop callback failed: {e}")
+
+    def _spill(self, job):
+        try:
+            WebhookSpill(job=job).save()
+        except Exception as e:
+            self._incr('dropped')
+            logger.error(f"Failed to spill webhook job to Mongo: {e}")
+            self._dropped(job)
+            return False
+        self._incr('spilled')
+        self._spill_pending = True
+        return True
+
+    def _refill(self):
+        """Nạp lại các job đã spill khi hàng đợi còn trống từ một nửa trở lên"""
+        if not self._refill_lock.acquire(blocking=False):
+            return
+        try:
+            room = self.queue_size - self._queue.qsize()
+            while room > self.queue_size // 2:
+                # find_and_modify(remove=True): nhiều process không lấy trùng job
+                spilled = WebhookSpill.objects.order_by('created_at').modify(remove=True)
+                if spilled is None:
+                    self._spill_pending = False
+                    return
+                try:
+                    self._queue.put_nowait(spilled.job)
+                except queue.Full:
+                    self._spill(spilled.job)
+                    return
+                room -= 1
+        except Exception as e:
+            logger.error(f"Failed to refill webhook queue from Mongo: {e}")
+        finally:
+            self._refill_lock.release()
+
+    # --- Worker ---
+    def _run(self):
+        while True:
+            try:
+                job = self._queue.get(timeout=1)
+            except queue.Empty:
+                if self._spill_pending:
+                    self._refill()
+                continue
+
+            if job is _STOP:
+                self._queue.task_done()
+                return
+
+            with self._lock:
+                self._busy += 1
+            try:
+                self.handler(job)
+                self._incr('completed')
+            except Exception as e:
+                self._incr('failed')
+                logger.error(f"Webhook job failed: {e}", exc_info=True)
+            finally:
+                with self._lock:
+                    self._busy -= 1
+                self._queue.task_done()
+
+            if self._spill_pending and self._queue.qsize() <= self.queue_size // 2:
+                self._refill()
+
+    # --- Monitoring ---
+    def _incr(self, name):
+        with self._lock:
+            self._counts[name] += 1
+
+    def stats(self):
+        with self._lock:
+            stats = dict(self._counts)
+            busy = self._busy
+            workers = len(self._threads)
+        stats.update({
+            'queue_depth': self._queue.qsize(),
+            'queue_capacity': self.queue_size,
+            'workers': workers,
+            'busy_workers': busy,
+            'utilisation': busy / workers if workers else 0.0,
+        })
+        return stats
+
+    def init_metrics(self, metrics):
+        """Export độ sâu hàng đợi và mức sử dụng worker qua PrometheusMetrics"""
+        register_stats(
+            metrics, 'webhook_dispatcher', self.stats,
+            counters={
+                'submitted': 'Số job webhook đã nhận',
+                'completed': 'Số job webhook đã xử lý xong',
+                'failed': 'Số job webhook bị lỗi khi xử lý',
+                'dropped': 'Số job webhook bị bỏ do backpressure',
+                'spilled': 'Số job webhook bị tràn xuống MongoDB',
+            },
+            gauges={
+                'queue_depth': 'Số job đang chờ trong hàng đợi',
+                'queue_capacity': 'Sức chứa tối đa của hàng đợi',
+                'workers': 'Số worker trong pool',
+                'busy_workers': 'Số worker đang gửi webhook',
+                'utilisation': 'Tỉ lệ worker đang bận (0-1)',
+            })
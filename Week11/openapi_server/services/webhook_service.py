@@ -1,40 +1,112 @@
-import requests
-import threading
+import hmac
+import json
+import hashlib
 import logging
 import datetime
-from openapi_server.db_models import Webhook
+from openapi_server.db_models import OutboxEvent
+from openapi_server.services.outbox_relay import OutboxRelay
+from openapi_server.services.subscriber_index import SubscriberIndex
+from openapi_server.services.webhook_dispatcher import WebhookDispatcher
+from openapi_server.services.http_client import DeliveryClient
+from openapi_server.services.delivery_scheduler import DeliveryScheduler
+from openapi_server.services.webhook_batcher import WebhookBatcher
+from openapi_server.services.webhook_coalescer import WebhookCoalescer
 
 logger = logging.getLogger(__name__)
 
-def _send_request(url, payload):
-    """Hàm gửi request thực tế (chạy ngầm)"""
-    try:
-        # Giả lập gửi POST request tới client
-        response = requests.post(url, json=payload, timeout=5)
-        logger.info(f"Webhook sent to {url} | Status: {response.status_code}")
-    except Exception as e:
-        logger.error(f"Failed to send webhook to {url}: {e}")
+# Client HTTP keep-alive dùng chung, mỗi host đích một connection pool
+http_client = DeliveryClient()
+
+# Retry/circuit breaker theo subscriber, job tới hạn retry quay lại hàng đợi dispatcher.
+# Không chờ hàng đợi: resubmit chạy trên luồng hẹn giờ (chung với batcher/coalescer) và worker
+delivery = DeliveryScheduler(client=http_client,
+                             resubmit=lambda job: dispatcher.submit(job, block=False))
+
+# Pool worker dùng chung cho cả process (cấu hình qua biến môi trường WEBHOOK_*)
+dispatcher = WebhookDispatcher(handler=delivery.deliver)
+
+def sign_headers(secret, body):
+    """Header chữ ký HMAC-SHA256 của body, để subscriber xác thực nguồn gửi"""
+    if not secret:
+        return None
+    digest = hmac.new(secret.encode('utf-8'), body, hashlib.sha256).hexdigest()
+    return {'X-Webhook-Signature': f'sha256={digest}'}
+
+# Gom sự kiện cho subscriber bật batch, dùng chung bộ hẹn giờ của delivery
+batcher = WebhookBatcher(submit=dispatcher.submit, timers=delivery.retries, sign=sign_headers)
+delivery.on_complete = batcher.on_complete
+dispatcher.on_drop = delivery.dropped  # Job retry bị bỏ vào dead letter, lô bị bỏ nhả subscriber
+
+# Index event_type -> subscriber trong bộ nhớ, thay cho query Webhook mỗi lần ghi
+subscriber_index = SubscriberIndex()
+
+def _serialise(payload):
+    return json.dumps(payload, ensure_ascii=False, separators=(',', ':')).encode('utf-8')
+
+def _route(sub, event_type, body, block=True):
+    """Gửi một thông báo (bytes JSON) tới subscriber: qua batcher hoặc gửi đơn"""
+    if sub.batch_size:
+        batcher.add(sub, body, block)
+        return
+    logger.info(f"Triggering webhook {event_type} for {sub.url}")
+    dispatcher.submit({
+        'url': sub.url,
+        'subscriber': str(sub.id),
+        'event': event_type,
+        'body': body,
+        'headers': sign_headers(sub.secret, body),
+        'attempt': 0
+    }, block=block)
+
+# Gộp các sự kiện dư thừa của cùng một product cho subscriber bật coalesce
+coalescer = WebhookCoalescer(
+    deliver=lambda sub, payload: _route(sub, payload['event'], _serialise(payload), block=False),
+    timers=delivery.retries)
+
+def _fan_out(events):
+    """
+    Fan-out một lô sự kiện lấy từ outbox (chạy trong relay, không nằm trên luồng HTTP).
+    Subscriber được tra từ subscriber_index, không query Mongo cho mỗi sự kiện.
+    """
+    for event in events:
+        subscribers = subscriber_index.subscribers_for(event.event)
+        if not subscribers:
+            continue
+
+        payload = {
+            'event': event.event,
+            'data': event.data,
+            'timestamp': str(event.created_at.replace(tzinfo=datetime.timezone.utc))
+        }
+        body = None
+        for sub in subscribers:
+            if sub.coalesce_window_ms:
+                coalescer.add(sub, payload)
+                continue
+            # Serialise một lần, dùng lại cùng bytes cho mọi subscriber
+            if body is None:
+                body = _serialise(payload)
+            _route(sub, event.event, body)
+
+# Relay đọc outbox theo lô (cấu hình qua biến môi trường OUTBOX_*)
+relay = OutboxRelay(publish=_fan_out)
 
 def trigger_event(event_type, data):
     """
     Hàm này được gọi từ Controller.
-    Nó tìm các subscriber quan tâm đến event_type và gửi thông báo.
+    Chỉ ghi sự kiện vào outbox (1 lần insert) rồi trả về ngay,
+    việc tìm subscriber và gửi thông báo do relay xử lý ở nền.
     """
-    # 1. Tìm tất cả webhook đăng ký sự kiện này
-    subscribers = Webhook.objects(events=event_type)
-    
-    if not subscribers:
-        return
+    OutboxEvent(event=event_type, data=data).save()
+    relay.wake()
 
-    payload = {
-        'event': event_type,
-        'data': data,
-        'timestamp': str(datetime.datetime.now(datetime.timezone.utc))
-    }
-
-    # 2. Gửi bất đồng bộ (Fire and Forget)
-    for sub in subscribers:
-        logger.info(f"Triggering webhook {event_type} for {sub.url}")
-        # Tạo luồng riêng để không block API chính
-        thread = threading.Thread(target=_send_request, args=(sub.url, payload))
-        thread.start()
\ No newline at end of file
+def trigger_events(events):
+    """
+    Như trigger_event nhưng cho nhiều sự kiện [(event_type, data)]:
+    ghi cả lô vào outbox bằng một lần insert_many rồi đánh thức relay.
+    """
+    if not events:
+        return
+    OutboxEvent.objects.insert([OutboxEvent(event=event_type, data=data) for event_type, data in events],
+                               load_bulk=False)
+    relay.wake()
@@ -3,7 +3,8 @@ import logging
 import connexion
 from flask_testing import TestCase
 
-from openapi_server.encoder import JSONEncoder
+from openapi_server import encoder
+from openapi_server.validation import CompiledRequestBodyValidator
 
 
 class BaseTestCase(TestCase):
@@ -11,6 +12,7 @@ class BaseTestCase(TestCase):
     def create_app(self):
         logging.getLogger('connexion.operation').setLevel('ERROR')
         app = connexion.App(__name__, specification_dir='../openapi/')
-        app.app.json_encoder = JSONEncoder
-        app.add_api('openapi.yaml', pythonic_params=True)
+        encoder.install(app)
+        app.add_api('openapi.yaml', pythonic_params=True,
+                    validator_map={'body': CompiledRequestBodyValidator})
         return app.app
@@ -0,0 +1,13 @@
+class ManualTimers:
+    """Bộ hẹn giờ giả: chỉ chạy callback khi test gọi fire()"""
+
+    def __init__(self):
+        self.pending = []
+
+    def call_later(self, delay, fn, *args):
+        self.pending.append((fn, args))
+
+    def fire(self):
+        pending, self.pending = self.pending, []
+        for fn, args in pending:
+            fn(*args)
@@ -0,0 +1,182 @@
+import threading
+import unittest
+
+from openapi_server.services.delivery_scheduler import (
+    CircuitBreaker, DeliveryScheduler, RetryScheduler)
+from openapi_server.test.fakes import ManualTimers
+
+
+class _FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+class _Response:
+    def __init__(self, status_code):
+        self.status_code = status_code
+
+
+class _FakeClient:
+    def __init__(self, statuses):
+        self.statuses = list(statuses)
+        self.calls = 0
+
+    def post(self, url, body, headers=None):
+        self.calls += 1
+        status = self.statuses.pop(0)
+        if isinstance(status, Exception):
+            raise status
+        return _Response(status)
+
+
+class TestCircuitBreaker(unittest.TestCase):
+
+    def test_opens_after_threshold_and_half_opens_after_timeout(self):
+        clock = _FakeClock()
+        breaker = CircuitBreaker(failure_threshold=2, reset_timeout=10, clock=clock)
+        breaker.record_failure()
+        self.assertTrue(breaker.allow())
+        breaker.record_failure()
+        self.assertFalse(breaker.allow())
+        self.assertEqual(breaker.retry_after(), 10)
+
+        clock.now = 10
+        self.assertTrue(breaker.allow())   # Lần gửi thử
+        self.assertFalse(breaker.allow())  # Chỉ một lần thử cùng lúc
+        breaker.record_failure()
+        self.assertEqual(breaker.state, CircuitBreaker.OPEN)
+
+        clock.now = 20
+        self.assertTrue(breaker.allow())
+        breaker.record_success()
+        self.assertEqual(breaker.state, CircuitBreaker.CLOSED)
+
+
+class TestRetryScheduler(unittest.TestCase):
+
+    def test_callbacks_run_in_due_order(self):
+        scheduler = RetryScheduler()
+        fired = []
+        done = threading.Event()
+        scheduler.call_later(0.06, lambda: (fired.append('late'), done.set()))
+        scheduler.call_later(0.01, fired.append, 'early')
+        self.assertTrue(done.wait(5))
+        self.assertEqual(fired, ['early', 'late'])
+        self.assertEqual(scheduler.pending(), 0)
+
+
+class TestDeliveryScheduler(unittest.TestCase):
+
+    def _scheduler(self, client, **kwargs):
+        self.resubmitted = []
+        scheduler = DeliveryScheduler(client, resubmit=self.resubmitted.append,
+                                      max_attempts=5, base_delay=0.01, max_delay=0.01,
+                                      **kwargs)
+        scheduler.retries.call_later = lambda delay, fn, job: fn(job)
+        return scheduler
+
+    def test_transient_failures_are_retried(self):
+        client = _FakeClient([503, ConnectionError('refused'), 204])
+        scheduler = self._scheduler(client, failure_threshold=10)
+        job = {'url': 'http://a.example/h', 'subscriber': 's1', 'body': b'{}', 'attempt': 0}
+
+        scheduler.deliver(job)
+        scheduler.deliver(self.resubmitted[-1])
+        scheduler.deliver(self.resubmitted[-1])
+
+        self.assertEqual([j['attempt'] for j in self.resubmitted], [1, 2])
+        stats = scheduler.stats()
+        self.assertEqual(stats['delivered'], 1)
+        self.assertEqual(stats['retried'], 2)
+
+    def test_open_circuit_short_circuits_without_calling_endpoint(self):
+        client = _FakeClient([500])
+        scheduler = self._scheduler(client, failure_threshold=1, reset_timeout=60)
+        job = {'url': 'http://a.example/h', 'subscriber': 's1', 'body': b'{}', 'attempt': 0}
+
+        scheduler.deliver(job)
+        scheduler.deliver(dict(job))
+
+        self.assertEqual(client.calls, 1)
+        stats = scheduler.stats()
+        self.assertEqual(stats['short_circuited'], 1)
+        self.assertEqual(stats['open_circuits'], 1)
+
+    def test_short_circuit_does_not_use_up_attempts(self):
+        client = _FakeClient([500])
+        scheduler = self._scheduler(client, failure_threshold=1, reset_timeout=60)
+        job = {'url': 'http://a.example/h', 'subscriber': 's1', 'body': b'{}', 'attempt': 0}
+        scheduler.deliver(job)  # Lỗi thật: breaker mở, attempt 1
+
+        for _ in range(10):
+            scheduler.deliver(self.resubmitted[-1])
+
+        self.assertEqual(client.calls, 1)
+        self.assertEqual(self.resubmitted[-1]['attempt'], 1)
+        self.assertEqual(scheduler.stats()['dead_lettered'], 0)
+
+    def _parking_scheduler(self, client, **kwargs):
+        scheduler = self._scheduler(client, failure_threshold=1, reset_timeout=60, **kwargs)
+        self.timers = ManualTimers()
+        scheduler.retries.call_later = self.timers.call_later
+        self.dead = []
+        scheduler.dead_letter = lambda job, error: self.dead.append(job)
+        return scheduler
+
+    def test_open_circuit_parks_jobs_until_breaker_allows_a_probe(self):
+        client = _FakeClient([500, 204])
+        scheduler = self._parking_scheduler(client)
+        job = {'url': 'http://a.example/h', 'subscriber': 's1', 'body': b'{}', 'attempt': 0}
+        scheduler.deliver(job)  # Breaker mở, job hẹn retry
+        self.timers.pending.clear()
+
+        for n in range(3):
+            scheduler.deliver(dict(job, n=n))
+        self.assertEqual(self.resubmitted, [])
+        self.assertEqual(scheduler.stats()['parked'], 3)
+        self.assertEqual(len(self.timers.pending), 1)  # Một hẹn giờ nhả cho cả subscriber
+
+        # Hết reset_timeout: chỉ một job đi làm lần gửi thử
+        self.timers.fire()
+        self.assertEqual([j['n'] for j in self.resubmitted], [0])
+        scheduler.breaker('s1').reset_timeout = 0
+        scheduler.deliver(self.resubmitted[0])
+
+        # Gửi thử thành công: breaker đóng, mọi job còn lại quay về hàng đợi
+        self.assertEqual([j['n'] for j in self.resubmitted], [0, 1, 2])
+        self.assertEqual(scheduler.stats()['parked'], 0)
+
+    def test_park_overflow_goes_to_dead_letter(self):
+        scheduler = self._parking_scheduler(_FakeClient([500]), park_max=2)
+        job = {'url': 'http://a.example/h', 'subscriber': 's1', 'body': b'{}', 'attempt': 0}
+        scheduler.deliver(job)
+
+        for n in range(5):
+            scheduler.deliver(dict(job, n=n))
+        self.assertEqual([j['n'] for j in self.dead], [0, 1, 2])
+        self.assertEqual(scheduler.stats()['parked'], 2)
+
+    def test_dropped_retry_goes_to_dead_letter(self):
+        scheduler = self._parking_scheduler(_FakeClient([]))
+        completed = []
+        scheduler.on_complete = completed.append
+        fresh = {'url': 'http://a.example/h', 'subscriber': 's1', 'body': b'{}', 'attempt': 0}
+
+        scheduler.dropped(fresh)
+        scheduler.dropped(dict(fresh, attempt=2))
+        scheduler.dropped(dict(fresh, parked=True))
+        self.assertEqual(completed, [fresh])
+        self.assertEqual(len(self.dead), 2)
+
+    def test_backoff_grows_exponentially_and_is_capped(self):
+        scheduler = DeliveryScheduler(_FakeClient([]), base_delay=1, max_delay=8)
+        self.assertLessEqual(scheduler.backoff(1), 1)
+        self.assertGreaterEqual(scheduler.backoff(3), 2)
+        self.assertLessEqual(scheduler.backoff(10), 8)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,51 @@
+import datetime
+import json
+import unittest
+
+from bson import ObjectId
+
+from openapi_server import encoder
+from openapi_server.models.product import Product
+
+
+class TestFastJsonifier(unittest.TestCase):
+    """FastJsonifier unit tests"""
+
+    def _backends(self):
+        backends = ['stdlib']
+        if encoder.orjson is not None:
+            backends.append('orjson')
+        return [encoder.FastJsonifier(backend) for backend in backends]
+
+    def test_fast_path_types(self):
+        data = {
+            'id': ObjectId('605c7211f0a2d1001f2f3a6a'),
+            'at': datetime.datetime(2024, 1, 2, 3, 4, 5),
+            'day': datetime.date(2024, 1, 2),
+            'model': Product(id='p1', name='Bàn', price=1.0),
+            'items': [1, 2.5, None],
+        }
+        for jsonifier in self._backends():
+            body = jsonifier.dumps(data)
+            self.assertTrue(body.endswith(b'\n'))
+            self.assertEqual(json.loads(body), {
+                'id': '605c7211f0a2d1001f2f3a6a',
+                'at': '2024-01-02T03:04:05Z',
+                'day': '2024-01-02',
+                'model': {'id': 'p1', 'name': 'Bàn', 'price': 1.0},
+                'items': [1, 2.5, None],
+            })
+
+    def test_loads_falls_back_to_text(self):
+        for jsonifier in self._backends():
+            self.assertEqual(jsonifier.loads(b'{"a": 1}'), {'a': 1})
+            self.assertEqual(jsonifier.loads('not json'), 'not json')
+
+    def test_unknown_type_raises(self):
+        for jsonifier in self._backends():
+            with self.assertRaises(TypeError):
+                jsonifier.dumps({'x': object()})
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,58 @@
+import threading
+import unittest
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+from openapi_server.services.http_client import DeliveryClient
+
+
+class _EchoHandler(BaseHTTPRequestHandler):
+    protocol_version = 'HTTP/1.1'  # Giữ kết nối keep-alive
+    received = []
+
+    def do_POST(self):
+        length = int(self.headers['Content-Length'])
+        self.received.append((self.headers['Content-Type'], self.rfile.read(length)))
+        self.send_response(204)
+        self.send_header('Content-Length', '0')
+        self.end_headers()
+
+    def log_message(self, *args):
+        pass
+
+
+class TestDeliveryClient(unittest.TestCase):
+    """DeliveryClient unit tests với HTTP server cục bộ"""
+
+    def setUp(self):
+        _EchoHandler.received = []
+        self.server = ThreadingHTTPServer(('127.0.0.1', 0), _EchoHandler)
+        threading.Thread(target=self.server.serve_forever, daemon=True).start()
+        self.url = f'http://127.0.0.1:{self.server.server_port}/hook'
+        self.client = DeliveryClient(pool_maxsize=2)
+
+    def tearDown(self):
+        self.client.close()
+        self.server.shutdown()
+        self.server.server_close()
+
+    def test_connections_are_reused_per_host(self):
+        body = b'{"event":"product.created"}'
+        for _ in range(3):
+            response = self.client.post(self.url, body)
+            self.assertEqual(response.status_code, 204)
+
+        stats = self.client.stats()
+        self.assertEqual(stats['requests'], 3)
+        self.assertEqual(stats['pool_misses'], 1)
+        self.assertEqual(stats['pool_hits'], 2)
+        self.assertEqual(stats['hosts'], 1)
+        self.assertGreater(stats['connect_seconds'], 0)
+
+    def test_body_is_sent_as_is(self):
+        body = '{"name":"Bàn phím"}'.encode('utf-8')
+        self.client.post(self.url, body, headers={'X-Test': '1'})
+        self.assertEqual(_EchoHandler.received, [('application/json', body)])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,28 @@
+import unittest
+
+from openapi_server.models.error import Error
+from openapi_server.models.product import Product
+from openapi_server.models.product_input import ProductInput
+
+
+class TestModels(unittest.TestCase):
+    """Generated model unit tests (slots, to_dict, __eq__)"""
+
+    def test_no_instance_dict(self):
+        product = ProductInput(name='Laptop', price=1.0)
+        self.assertFalse(hasattr(product, '__dict__'))
+        self.assertIs(product.openapi_types, ProductInput.openapi_types)
+
+    def test_to_dict(self):
+        product = Product(id='p1', name='Laptop', price=1.0)
+        self.assertEqual(product.to_dict(), {'id': 'p1', 'name': 'Laptop', 'price': 1.0,
+                                             'description': None, 'created_at': None})
+
+    def test_equality(self):
+        self.assertEqual(ProductInput('a', 1.0), ProductInput.from_dict({'name': 'a', 'price': 1.0}))
+        self.assertNotEqual(ProductInput('a', 1.0), ProductInput('a', 2.0))
+        self.assertNotEqual(Error(message='a'), ProductInput(name='a'))
+
+
+if __name__ == '__main__':
+    unittest.main()
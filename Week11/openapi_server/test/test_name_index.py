@@ -0,0 +1,80 @@
+import unittest
+from unittest import mock
+
+from openapi_server.services.name_index import NameIndex
+
+
+def _collection(docs):
+    collection = mock.Mock()
+    collection.find.return_value.batch_size.return_value = iter(docs)
+    return collection
+
+
+class TestNameIndex(unittest.TestCase):
+    """NameIndex unit tests (không cần MongoDB)"""
+
+    def setUp(self):
+        docs = [
+            {'_id': 'p1', 'name': 'Bàn phím cơ'},
+            {'_id': 'p2', 'name': 'Bàn'},
+            {'_id': 'p3', 'name': 'Bàn là hơi nước'},
+            {'_id': 'p4', 'name': 'Chuột'},
+        ]
+        self.index = NameIndex()
+        with mock.patch('openapi_server.services.name_index.DbProduct._get_collection',
+                        return_value=_collection(docs)):
+            self.index.build()
+
+    def _ids(self, prefix, limit=10):
+        return [item['id'] for item in self.index.suggest(prefix, limit)]
+
+    def test_ranks_exact_then_shorter_names(self):
+        self.assertEqual(self._ids('ban'), ['p2', 'p1', 'p3'])
+        self.assertEqual(self._ids('BÀN', limit=2), ['p2', 'p1'])
+        self.assertEqual(self._ids('x'), [])
+
+    def test_follows_product_changes(self):
+        self.index.on_change('product.created', [{'id': 'p5', 'name': 'Bảng vẽ'}])
+        self.index.on_change('product.updated', [{'id': 'p4', 'name': 'Bàn di chuột'}])
+        self.index.on_change('product.deleted', [{'id': 'p1', 'name': 'Bàn phím cơ'}])
+
+        self.assertEqual(self._ids('chu'), [])
+        self.assertEqual(self._ids('bang'), ['p5'])
+        self.assertEqual(self._ids('ban'), ['p2', 'p5', 'p4', 'p3'])
+        self.assertEqual(self.index.stats()['entries'], 4)
+
+    def test_ranks_across_whole_prefix_range(self):
+        long_names = [{'id': f'l{i}', 'name': f'Bàn a mẫu dài số {i:05d}'} for i in range(3000)]
+        self.index.on_change('product.created', long_names)
+        self.index.on_change('product.created', [{'id': 'short', 'name': 'Bàn z'}])
+        self.assertEqual(self._ids('ban ', limit=1), ['short'])
+
+    def test_short_prefix_uses_cached_top_kept_current(self):
+        names = [{'id': f'l{i}', 'name': f'Bàn mẫu số {i:05d}'} for i in range(300)]
+        self.index.top_min_range = 10
+        self.index.on_change('product.created', names)
+        self.assertEqual(self._ids('b', limit=2), ['p2', 'p1'])
+        self.assertIn('b', self.index._top)
+
+        self.index.on_change('product.created', [{'id': 'short', 'name': 'Bé'}])
+        self.index.on_change('product.deleted', [{'id': 'p2', 'name': 'Bàn'}])
+        self.index.on_change('product.updated', [{'id': 'l7', 'name': 'Bo'}])
+        self.assertEqual(self._ids('b', limit=3), ['l7', 'short', 'p1'])
+        cached = self._ids('b', limit=50)
+        self.index._top.clear()
+        self.index.top_min_range = 10 ** 6  # Duyệt lại cả khoảng: phải ra đúng top đã giữ
+        self.assertEqual(self._ids('b', limit=50), cached)
+
+    def test_rejects_prefix_that_normalises_to_nothing(self):
+        for prefix in (' ', '\u0301'):
+            with self.assertRaises(ValueError):
+                self.index.suggest(prefix)
+
+    def test_prefix_ending_in_max_code_point(self):
+        self.index.on_change('product.created', [{'id': 'max', 'name': 'z\U0010ffff!'}])
+        self.assertEqual(self._ids('z\U0010ffff'), ['max'])
+
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,20 @@
+import unittest
+
+from openapi_server.services.pagination import encode_cursor, decode_cursor
+
+
+class TestPaginationCursor(unittest.TestCase):
+
+    def test_round_trip(self):
+        token = encode_cursor([1299.99, '605c7211f0a2d1001f2f3a6a'])
+        self.assertNotIn('=', token)
+        self.assertEqual(decode_cursor(token, 2), [1299.99, '605c7211f0a2d1001f2f3a6a'])
+
+    def test_rejects_malformed_tokens(self):
+        for token in ('zzz', '!!!', encode_cursor({'id': 1}), encode_cursor(['a', 'b'])):
+            with self.assertRaises(ValueError):
+                decode_cursor(token, 1)
+
+
+if __name__ == '__main__':
+    unittest.main()
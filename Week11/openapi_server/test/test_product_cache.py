@@ -0,0 +1,86 @@
+import threading
+import unittest
+
+from openapi_server.services.product_cache import ProductCache, LocalSharedTier
+
+
+class TestProductCache(unittest.TestCase):
+    """ProductCache unit tests (không cần MongoDB)"""
+
+    def setUp(self):
+        self.loads = []
+        self.release = threading.Event()
+        self.release.set()
+        self.cache = ProductCache(load=self._load, max_entries=2, ttl=60)
+
+    def _load(self, product_id):
+        self.loads.append(product_id)
+        self.release.wait(5)
+        if product_id == 'missing':
+            return None
+        return {'id': product_id, 'name': f'P{len(self.loads)}'}, 1
+
+    def test_read_through_and_invalidate(self):
+        self.assertEqual(self.cache.get('p1')[0]['name'], 'P1')
+        self.assertEqual(self.cache.get('p1')[0]['name'], 'P1')
+        self.assertIsNone(self.cache.get('missing'))
+        self.assertEqual(self.loads, ['p1', 'missing'])
+
+        self.cache.invalidate('product.updated', [{'id': 'p1'}])
+        self.assertEqual(self.cache.get('p1')[0]['name'], 'P3')
+        self.assertEqual(self.cache.stats()['hits'], 1)
+
+    def test_concurrent_misses_share_one_load(self):
+        self.release.clear()
+        results = []
+        threads = [threading.Thread(target=lambda: results.append(self.cache.get('p1'))) for _ in range(8)]
+        for thread in threads:
+            thread.start()
+        while self.cache.stats()['coalesced'] < 7:
+            threading.Event().wait(0.01)
+        self.release.set()
+        for thread in threads:
+            thread.join()
+
+        self.assertEqual(self.loads, ['p1'])
+        self.assertEqual(len(results), 8)
+        self.assertTrue(all(result is results[0] for result in results))
+
+    def test_write_during_load_is_not_cached(self):
+        self.release.clear()
+        thread = threading.Thread(target=self.cache.get, args=('p1',))
+        thread.start()
+        while not self.loads:
+            threading.Event().wait(0.01)
+        self.cache.invalidate('product.updated', [{'id': 'p1'}])
+        self.release.set()
+        thread.join()
+
+        self.cache.get('p1')
+        self.assertEqual(self.loads, ['p1', 'p1'])
+
+    def test_write_during_load_skips_shared_tier(self):
+        shared = LocalSharedTier()
+        self.cache = ProductCache(load=self._load, shared=shared, ttl=60)
+        self.release.clear()
+        thread = threading.Thread(target=self.cache.get, args=('p1',))
+        thread.start()
+        while not self.loads:
+            threading.Event().wait(0.01)
+        self.cache.invalidate('product.updated', [{'id': 'p1'}])
+        self.release.set()
+        thread.join()
+        self.assertIsNone(shared.get('p1'))
+
+    def test_shared_tier_serves_other_processes(self):
+        shared = LocalSharedTier()
+        first = ProductCache(load=self._load, shared=shared, ttl=60)
+        second = ProductCache(load=self._load, shared=shared, ttl=60)
+        first.get('p1')
+        self.assertEqual(second.get('p1')[0]['name'], 'P1')
+        self.assertEqual(second.stats()['shared_hits'], 1)
+        self.assertEqual(self.loads, ['p1'])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -1,10 +1,14 @@
+import os
 import unittest
 
+from bson import ObjectId
 from flask import json
+from mongoengine import connect, disconnect
 
 from openapi_server.models.error import Error  # noqa: E501
 from openapi_server.models.product import Product  # noqa: E501
 from openapi_server.models.product_input import ProductInput  # noqa: E501
+from openapi_server.db_models import Product as DbProduct
 from openapi_server.test import BaseTestCase
 
 
@@ -94,5 +98,66 @@ class TestProductController(BaseTestCase):
                        'Response body is : ' + response.data.decode('utf-8'))
 
 
+class TestBatchProducts(BaseTestCase):
+    """POST /products:batch integration tests (cần MongoDB, đặt qua MONGO_URI)"""
+
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        connect('product_db_test', host=os.getenv('MONGO_URI', 'mongodb://localhost:27017'),
+                serverSelectionTimeoutMS=2000)
+
+    @classmethod
+    def tearDownClass(cls):
+        disconnect()
+        super().tearDownClass()
+
+    def setUp(self):
+        DbProduct.objects.delete()
+        self.a = DbProduct(name='A', price=1).save()
+        self.b = DbProduct(name='B', price=1).save()
+        self.d = DbProduct(name='D', price=1).save()
+
+    def tearDown(self):
+        DbProduct.objects.delete()
+
+    def _batch(self, operations):
+        response = self.client.open('/api/v1/products:batch', method='POST',
+                                    data=json.dumps({'operations': operations}),
+                                    content_type='application/json')
+        self.assert200(response, 'Response body is : ' + response.data.decode('utf-8'))
+        return response.json
+
+    def test_mixed_results(self):
+        a, b, d = str(self.a.id), str(self.b.id), str(self.d.id)
+        report = self._batch([
+            {'op': 'create', 'data': {'name': 'New', 'price': 3}},
+            {'op': 'update', 'id': a, 'version': 1, 'data': {'name': 'A2', 'price': 2}},
+            {'op': 'update', 'id': b, 'version': 7, 'data': {'name': 'B2', 'price': 2}},
+            {'op': 'delete', 'id': d},
+            {'op': 'delete', 'id': str(ObjectId())},
+            {'op': 'update', 'id': 'bad', 'data': {'name': 'x', 'price': 1}},
+            {'op': 'update', 'id': a, 'data': {'name': 'A3', 'price': 2}},
+            {'op': 'create'},
+        ])
+
+        self.assertEqual([r['status'] for r in report['results']], [201, 200, 412, 204, 404, 400, 400, 400])
+        self.assertEqual((report['succeeded'], report['failed']), (3, 5))
+        self.assertEqual(report['results'][1]['product']['name'], 'A2')
+
+        self.assertEqual((DbProduct.objects.get(id=a).name, DbProduct.objects.get(id=a).version), ('A2', 2))
+        self.assertEqual((DbProduct.objects.get(id=b).name, DbProduct.objects.get(id=b).version), ('B', 1))
+        self.assertEqual(DbProduct.objects(id=d).count(), 0)
+        self.assertEqual(DbProduct.objects(name='New').count(), 1)
+
+    def test_legacy_product_without_version(self):
+        collection = DbProduct._get_collection()
+        collection.update_one({'_id': self.a.id}, {'$unset': {'version': 1}})
+        report = self._batch([{'op': 'update', 'id': str(self.a.id), 'version': 1,
+                               'data': {'name': 'A2', 'price': 2}}])
+        self.assertEqual(report['results'][0]['status'], 200)
+        self.assertEqual(DbProduct.objects.get(id=self.a.id).version, 2)
+
+
 if __name__ == '__main__':
     unittest.main()
@@ -0,0 +1,24 @@
+import unittest
+
+from bson import ObjectId
+
+from openapi_server.db_models import Product as DbProduct
+from openapi_server.services.product_reads import to_items
+
+
+class TestProductReads(unittest.TestCase):
+    """product_reads.to_items unit tests (không cần MongoDB)"""
+
+    def test_matches_document_to_dict(self):
+        docs = [{'_id': ObjectId(), 'name': 'Bàn', 'price': 1.5, 'description': 'x'},
+                {'_id': ObjectId(), 'name': 'Ghế', 'price': 2.0}]
+        self.assertEqual(to_items(docs), [DbProduct._from_son(doc).to_dict() for doc in docs])
+
+    def test_projected_fields(self):
+        product_id = ObjectId()
+        self.assertEqual(to_items([{'_id': product_id, 'price': 3.0}], ('price',)),
+                         [{'id': str(product_id), 'price': 3.0}])
+
+
+if __name__ == '__main__':
+    unittest.main()
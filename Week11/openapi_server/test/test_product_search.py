@@ -0,0 +1,39 @@
+import unittest
+from unittest import mock
+
+from openapi_server.services.pagination import encode_cursor
+from openapi_server.services.product_search import search_page
+
+_OID = '605c7211f0a2d1001f2f3a6a'
+
+
+class TestSearchPageCursor(unittest.TestCase):
+    """Kiểm tra cursor của search_page (không cần MongoDB: cursor sai bị từ chối trước khi query)"""
+
+    def test_rejects_cursor_values_of_the_wrong_type(self):
+        cases = [
+            ('price', {'$ne': None}),
+            ('price', True),
+            ('price', '10'),
+            ('-name', {'$gt': ''}),
+            ('name', 1),
+        ]
+        with mock.patch('openapi_server.services.product_search.DbProduct') as product:
+            for sort, value in cases:
+                with self.assertRaises(ValueError, msg=(sort, value)):
+                    search_page({'sort': sort, 'after': encode_cursor([value, _OID])})
+            product.objects.assert_not_called()
+
+    def test_accepts_cursor_values_of_the_sort_field_type(self):
+        with mock.patch('openapi_server.services.product_search.DbProduct') as product:
+            product.objects.return_value.only.return_value.order_by.return_value \
+                .limit.return_value.as_pymongo.return_value = []
+            for sort, value in (('price', 10), ('-price', 9.5), ('name', 'Bàn')):
+                self.assertEqual(search_page({'sort': sort, 'after': encode_cursor([value, _OID])})[:2],
+                                 ([], None))
+            raw = product.objects.call_args.kwargs['__raw__']
+            self.assertEqual(raw['$and'][1]['$or'][0], {'name': {'$gt': 'Bàn'}})
+
+
+if __name__ == '__main__':
+    unittest.main()
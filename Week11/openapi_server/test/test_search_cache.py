@@ -0,0 +1,53 @@
+import time
+import unittest
+
+from openapi_server.services.search_cache import SearchCache
+
+
+class TestSearchCache(unittest.TestCase):
+
+    def test_key_is_canonical(self):
+        a = SearchCache.key({'name_contains': 'Laptop', 'min_price': 10, 'fields': ['price', 'name']})
+        b = SearchCache.key({'fields': ['name', 'price'], 'min_price': 10.0, 'name_contains': 'LAPTOP'})
+        self.assertEqual(a, b)
+        self.assertNotEqual(a, SearchCache.key({'name_contains': 'laptop'}))
+
+    def test_lru_eviction(self):
+        cache = SearchCache(max_entries=2, ttl=60)
+        cache.put('a', 1)
+        cache.put('b', 2)
+        cache.get('a')
+        cache.put('c', 3)
+        self.assertIsNone(cache.get('b'))
+        self.assertEqual(cache.get('a'), 1)
+        self.assertEqual(cache.stats()['evictions'], 1)
+
+    def test_ttl_expiry(self):
+        cache = SearchCache(max_entries=10, ttl=0.01)
+        cache.put('a', 1)
+        time.sleep(0.02)
+        self.assertIsNone(cache.get('a'))
+
+    def test_invalidate_bumps_generation(self):
+        cache = SearchCache(max_entries=10, ttl=60)
+        cache.put('a', 1)
+        cache.invalidate('product.updated', [])
+        self.assertIsNone(cache.get('a'))
+        cache.put('a', 2)
+        self.assertEqual(cache.get('a'), 2)
+        stats = cache.stats()
+        self.assertEqual((stats['hits'], stats['misses'], stats['invalidations']), (1, 1, 1))
+
+    def test_put_skipped_when_invalidated_during_read(self):
+        cache = SearchCache(max_entries=10, ttl=60)
+        self.assertIsNone(cache.get('a'))
+        generation = cache.generation()
+        cache.invalidate('product.updated', [])  # Ghi đồng thời trong lúc đang đọc Mongo
+        cache.put('a', 'stale', generation)
+        self.assertIsNone(cache.get('a'))
+        cache.put('a', 'fresh', cache.generation())
+        self.assertEqual(cache.get('a'), 'fresh')
+
+
+if __name__ == '__main__':
+    unittest.main()
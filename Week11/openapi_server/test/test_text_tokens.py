@@ -0,0 +1,22 @@
+import unittest
+
+from openapi_server.services.text_tokens import normalize, name_grams, query_grams
+
+
+class TestTextTokens(unittest.TestCase):
+
+    def test_normalize_strips_case_and_diacritics(self):
+        self.assertEqual(normalize('Bàn phím Đỏ'), 'ban phim do')
+
+    def test_query_grams_are_subset_of_matching_name_grams(self):
+        name = 'Laptop Gaming Siêu Mỏng'
+        for term in ('LAPTOP', 'top g', 'siêu', 'mo', 'ng'):
+            self.assertTrue(set(query_grams(term)) <= set(name_grams(name)), term)
+
+    def test_short_terms_cannot_use_index(self):
+        self.assertEqual(query_grams('a'), [])
+        self.assertEqual(query_grams('TV'), ['tv'])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,40 @@
+import datetime
+import unittest
+from typing import Dict, List
+
+from openapi_server import util
+from openapi_server.models.error import Error
+from openapi_server.models.product import Product
+from openapi_server.models.product_input import ProductInput
+
+
+class TestCompiledDeserializer(unittest.TestCase):
+    """util.compile_deserializer unit tests"""
+
+    def test_model_fields_and_coercion(self):
+        product = Product.from_dict({'id': 'p1', 'name': 'Laptop', 'price': 10,
+                                     'createdAt': '2024-01-02T03:04:05Z', 'ignored': 1})
+        self.assertEqual(product.name, 'Laptop')
+        self.assertIsInstance(product.price, float)
+        self.assertEqual(product.created_at.year, 2024)
+        self.assertIsNone(product.description)
+
+    def test_required_field_still_validated(self):
+        with self.assertRaises(ValueError):
+            ProductInput.from_dict({'name': None, 'price': 1})
+
+    def test_containers_and_none(self):
+        items = util._deserialize([{'message': 'a', 'code': '7'}, None], List[Error])
+        self.assertEqual(items[0].code, 7)
+        self.assertIsNone(items[1])
+        self.assertEqual(util._deserialize({'a': '1.5'}, Dict[str, float]), {'a': 1.5})
+        self.assertIsNone(util._deserialize(None, List[str]))
+        self.assertEqual(util._deserialize('2024-01-02', datetime.date), datetime.date(2024, 1, 2))
+
+    def test_compiled_once_per_type(self):
+        self.assertIs(util.compile_deserializer(List[ProductInput]),
+                      util.compile_deserializer(List[ProductInput]))
+
+
+if __name__ == '__main__':
+    unittest.main()
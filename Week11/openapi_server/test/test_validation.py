@@ -0,0 +1,84 @@
+import unittest
+
+from connexion.decorators.validation import RequestBodyValidator
+from connexion.exceptions import BadRequestProblem
+from connexion.json_schema import resolve_refs
+
+from openapi_server.schemas import load_spec
+from openapi_server.validation import CompiledRequestBodyValidator, compile_schema
+
+
+def _detail(validator, data):
+    try:
+        return validator.validate_schema(data, 'test')
+    except BadRequestProblem as e:
+        return e.detail
+
+
+class TestCompiledRequestBodyValidator(unittest.TestCase):
+    """CompiledRequestBodyValidator unit tests (không cần MongoDB)"""
+
+    @classmethod
+    def setUpClass(cls):
+        cls.schemas = resolve_refs(load_spec())['components']['schemas']
+
+    def _pair(self, name):
+        schema = self.schemas[name]
+        return (CompiledRequestBodyValidator(schema, ['application/json'], None),
+                RequestBodyValidator(schema, ['application/json'], None))
+
+    def test_spec_schemas_compile(self):
+        for name in ('ProductInput', 'BatchRequest'):
+            self.assertIsNotNone(compile_schema(self.schemas[name]), name)
+
+    def test_same_result_as_jsonschema(self):
+        payloads = {
+            'ProductInput': [
+                {'name': 'Bàn', 'price': 1.5},
+                {'name': 'Bàn', 'price': 2, 'description': 'gỗ', 'extra': 1},
+                {'name': 'Bàn'},
+                {'name': 1, 'price': 1},
+                {'name': 'Bàn', 'price': True},
+                {'name': 'Bàn', 'price': '1'},
+                [], None, 'Bàn',
+            ],
+            'BatchRequest': [
+                {'operations': [{'op': 'create', 'data': {'name': 'a', 'price': 1}}]},
+                {'operations': [{'op': 'delete', 'id': 'x', 'version': 2}]},
+                {'operations': []},
+                {'operations': [{'op': 'nope'}]},
+                {'operations': [{'op': 'update', 'version': 0}]},
+                {'operations': [{'op': 'update', 'version': 1.0}]},
+                {'operations': [{'op': 'create', 'data': {'name': 'a'}}]},
+                {},
+            ],
+        }
+        for name, cases in payloads.items():
+            compiled, default = self._pair(name)
+            for data in cases:
+                self.assertEqual(_detail(compiled, data), _detail(default, data), (name, data))
+
+    def test_nullable_and_limits(self):
+        check = compile_schema({
+            'type': 'object', 'nullable': True,
+            'properties': {
+                'limit': {'type': 'integer', 'minimum': 1, 'maximum': 10},
+                'ids': {'type': 'array', 'items': {'type': 'string'}, 'maxItems': 2},
+            },
+        })
+        self.assertTrue(check(None))
+        self.assertTrue(check({'limit': 10, 'ids': ['a', 'b']}))
+        self.assertFalse(check({'limit': 11}))
+        self.assertFalse(check({'ids': ['a', 'b', 'c']}))
+        self.assertFalse(check({'ids': [1]}))
+
+    def test_unsupported_keyword_falls_back(self):
+        schema = {'type': 'string', 'pattern': '^a'}
+        self.assertIsNone(compile_schema(schema))
+        validator = CompiledRequestBodyValidator(schema, ['application/json'], None)
+        self.assertIsNone(_detail(validator, 'abc'))
+        self.assertIn('does not match', _detail(validator, 'b'))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,74 @@
+import json
+import unittest
+from types import SimpleNamespace
+
+from openapi_server.services.webhook_batcher import WebhookBatcher
+from openapi_server.test.fakes import ManualTimers
+
+
+class TestWebhookBatcher(unittest.TestCase):
+    """WebhookBatcher unit tests (không cần MongoDB)"""
+
+    def setUp(self):
+        self.jobs = []
+        self.blocking = []
+        self.timers = ManualTimers()
+        self.batcher = WebhookBatcher(submit=self._submit, timers=self.timers,
+                                      sign=lambda secret, body: {'X-Sig': secret})
+        self.sub = SimpleNamespace(id='s1', url='http://a.example/h', secret='k',
+                                   batch_size=3, batch_window_ms=100)
+
+    def _submit(self, job, block):
+        self.jobs.append(job)
+        self.blocking.append(block)
+
+    def _events(self, job):
+        return [event['n'] for event in json.loads(job['body'])]
+
+    def _add(self, *numbers):
+        for n in numbers:
+            self.batcher.add(self.sub, json.dumps({'n': n}).encode())
+
+    def test_flushes_when_batch_is_full(self):
+        self._add(1, 2, 3)
+        self.assertEqual(len(self.jobs), 1)
+        self.assertEqual(self._events(self.jobs[0]), [1, 2, 3])
+        self.assertEqual(self.jobs[0]['headers'], {'X-Sig': 'k'})
+        self.assertTrue(self.jobs[0]['batched'])
+
+    def test_flushes_partial_batch_when_window_expires(self):
+        self._add(1)
+        self.assertEqual(self.jobs, [])
+        self.timers.fire()
+        self.assertEqual(self._events(self.jobs[0]), [1])
+
+    def test_next_batch_waits_for_previous_delivery(self):
+        self._add(1, 2, 3, 4, 5, 6)
+        self.assertEqual(len(self.jobs), 1)  # Lô thứ hai bị giữ lại để đảm bảo thứ tự
+
+        self.batcher.on_complete(self.jobs[0])
+        self.assertEqual(len(self.jobs), 2)
+        self.assertEqual(self._events(self.jobs[1]), [4, 5, 6])
+
+    def test_batch_size_holds_after_backlog(self):
+        self._add(1, 2, 3, 4, 5, 6, 7, 8)  # 5 sự kiện dồn lại trong lúc lô đầu đang gửi
+        self.batcher.on_complete(self.jobs[0])
+        self.assertEqual(self._events(self.jobs[1]), [4, 5, 6])
+        self.batcher.on_complete(self.jobs[1])
+        self.timers.fire()
+        self.assertEqual(self._events(self.jobs[2]), [7, 8])
+
+    def test_only_fan_out_waits_for_queue(self):
+        self._add(1, 2, 3, 4)
+        self.batcher.on_complete(self.jobs[0])
+        self.timers.fire()
+        # Lô đầy từ fan-out được chờ; lô từ worker (on_complete) và luồng hẹn giờ thì không
+        self.assertEqual(self.blocking, [True, False])
+        self._add(5, 6, 7)  # Đầy trong lúc lô trước đang gửi: on_complete gửi lô này
+        self.batcher.on_complete(self.jobs[1])
+        self.assertEqual(self._events(self.jobs[2]), [5, 6, 7])
+        self.assertEqual(self.blocking, [True, False, False])
+
+
+if __name__ == '__main__':
+    unittest.main()
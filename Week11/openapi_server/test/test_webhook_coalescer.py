@@ -0,0 +1,55 @@
+import unittest
+from types import SimpleNamespace
+
+from openapi_server.services.webhook_coalescer import WebhookCoalescer
+from openapi_server.test.fakes import ManualTimers
+
+
+def _event(event, product_id, **data):
+    return {'event': event, 'data': dict(id=product_id, **data), 'timestamp': 't'}
+
+
+class TestWebhookCoalescer(unittest.TestCase):
+    """WebhookCoalescer unit tests (không cần MongoDB)"""
+
+    def setUp(self):
+        self.delivered = []
+        self.timers = ManualTimers()
+        self.coalescer = WebhookCoalescer(
+            deliver=lambda sub, payload: self.delivered.append(payload), timers=self.timers)
+        self.sub = SimpleNamespace(id='s1', url='http://a.example/h', coalesce_window_ms=500)
+
+    def test_keeps_latest_state_per_product(self):
+        for price in (1, 2, 3):
+            self.coalescer.add(self.sub, _event('product.updated', 'p1', price=price))
+        self.coalescer.add(self.sub, _event('product.updated', 'p2', price=9))
+        self.assertEqual(self.delivered, [])
+
+        self.timers.fire()
+        self.assertEqual([(p['data']['id'], p['data']['price'], p['coalesced_events'])
+                          for p in self.delivered], [('p1', 3, 3), ('p2', 9, 1)])
+
+    def test_created_then_updated_stays_created(self):
+        self.coalescer.add(self.sub, _event('product.created', 'p1', price=1))
+        self.coalescer.add(self.sub, _event('product.updated', 'p1', price=2))
+        self.timers.fire()
+        self.assertEqual(self.delivered[0]['event'], 'product.created')
+        self.assertEqual(self.delivered[0]['data']['price'], 2)
+
+    def test_created_then_deleted_collapses(self):
+        self.coalescer.add(self.sub, _event('product.created', 'p1'))
+        self.coalescer.add(self.sub, _event('product.updated', 'p1'))
+        self.coalescer.add(self.sub, _event('product.deleted', 'p1'))
+        self.timers.fire()
+        self.assertEqual(self.delivered, [])
+        self.assertEqual(self.coalescer.stats()['cancelled'], 3)
+
+    def test_updated_then_deleted_becomes_deleted(self):
+        self.coalescer.add(self.sub, _event('product.updated', 'p1'))
+        self.coalescer.add(self.sub, _event('product.deleted', 'p1'))
+        self.timers.fire()
+        self.assertEqual([p['event'] for p in self.delivered], ['product.deleted'])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,110 @@
+import time
+import threading
+import unittest
+
+from openapi_server.services.webhook_dispatcher import WebhookDispatcher
+
+
+class TestWebhookDispatcher(unittest.TestCase):
+    """WebhookDispatcher unit tests (không cần MongoDB)"""
+
+    def setUp(self):
+        self.handled = []
+        self.started = threading.Event()
+        self.release = threading.Event()
+
+    def _blocking_handler(self, job):
+        self.started.set()
+        self.release.wait(5)
+        self.handled.append(job['n'])
+
+    def test_all_jobs_delivered_by_fixed_pool(self):
+        dispatcher = WebhookDispatcher(handler=lambda job: self.handled.append(job['n']),
+                                       workers=3, queue_size=10, backpressure='block')
+        for n in range(50):
+            self.assertTrue(dispatcher.submit({'n': n}))
+        dispatcher.stop(timeout=5)
+
+        self.assertEqual(sorted(self.handled), list(range(50)))
+        stats = dispatcher.stats()
+        self.assertEqual(stats['completed'], 50)
+        self.assertEqual(stats['dropped'], 0)
+
+    def test_drop_oldest_discards_oldest_queued_job(self):
+        dispatcher = WebhookDispatcher(handler=self._blocking_handler,
+                                       workers=1, queue_size=2, backpressure='drop_oldest')
+        dispatcher.submit({'n': 0})
+        self.assertTrue(self.started.wait(5))
+        for n in range(1, 4):
+            self.assertTrue(dispatcher.submit({'n': n}))
+        self.assertEqual(dispatcher.stats()['queue_depth'], 2)
+
+        self.release.set()
+        dispatcher.stop(timeout=5)
+        self.assertEqual(self.handled, [0, 2, 3])
+        self.assertEqual(dispatcher.stats()['dropped'], 1)
+
+    def test_drop_notifies_callback(self):
+        dispatcher = WebhookDispatcher(handler=self._blocking_handler,
+                                       workers=1, queue_size=1, backpressure='drop_oldest')
+        dropped = []
+        dispatcher.on_drop = dropped.append
+        dispatcher.submit({'n': 0})
+        self.assertTrue(self.started.wait(5))
+        dispatcher.submit({'n': 1})
+        dispatcher.submit({'n': 2})
+        self.assertEqual(dropped, [{'n': 1}])
+
+        self.release.set()
+        dispatcher.stop(timeout=5)
+
+    def test_block_gives_up_after_timeout(self):
+        dispatcher = WebhookDispatcher(handler=self._blocking_handler, workers=1,
+                                       queue_size=1, backpressure='block', block_timeout=0.05)
+        dispatcher.submit({'n': 0})
+        self.assertTrue(self.started.wait(5))
+        self.assertTrue(dispatcher.submit({'n': 1}))
+        self.assertFalse(dispatcher.submit({'n': 2}))
+
+        stats = dispatcher.stats()
+        self.assertEqual(stats['dropped'], 1)
+        self.assertEqual(stats['busy_workers'], 1)
+        self.assertEqual(stats['utilisation'], 1.0)
+
+        self.release.set()
+        dispatcher.stop(timeout=5)
+        self.assertEqual(self.handled, [0, 1])
+
+    def test_non_blocking_submit_drops_immediately(self):
+        dispatcher = WebhookDispatcher(handler=self._blocking_handler, workers=1,
+                                       queue_size=1, backpressure='block', block_timeout=60)
+        dropped = []
+        dispatcher.on_drop = dropped.append
+        dispatcher.submit({'n': 0})
+        self.assertTrue(self.started.wait(5))
+        self.assertTrue(dispatcher.submit({'n': 1}, block=False))
+
+        started = time.monotonic()
+        self.assertFalse(dispatcher.submit({'n': 2}, block=False))
+        self.assertLess(time.monotonic() - started, 1)  # Không chờ block_timeout
+        self.assertEqual(dropped, [{'n': 2}])
+
+        self.release.set()
+        dispatcher.stop(timeout=5)
+
+    def test_handler_errors_are_counted(self):
+        def failing(job):
+            raise RuntimeError('boom')
+
+        dispatcher = WebhookDispatcher(handler=failing, workers=1, queue_size=5)
+        dispatcher.submit({'n': 0})
+        dispatcher.stop(timeout=5)
+        self.assertEqual(dispatcher.stats()['failed'], 1)
+
+    def test_invalid_backpressure_policy(self):
+        with self.assertRaises(ValueError):
+            WebhookDispatcher(handler=print, backpressure='ignore')
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -12,24 +12,88 @@ def _deserialize(data, klass):
 
     :return: object.
     """
-    if data is None:
-        return None
-
-    if klass in (int, float, str, bool, bytearray):
-        return _deserialize_primitive(data, klass)
-    elif klass == object:
-        return _deserialize_object(data)
-    elif klass == datetime.date:
-        return deserialize_date(data)
-    elif klass == datetime.datetime:
-        return deserialize_datetime(data)
-    elif typing_utils.is_generic(klass):
+    return compile_deserializer(klass)(data)
+
+
+# Deserializer đã biên dịch cho mỗi kiểu (class, List[...], Dict[...]), tạo một lần rồi dùng lại
+_deserializers = {}
+
+
+def compile_deserializer(klass):
+    """Returns a function data -> object specialised for klass.
+
+    Kiểu của từng trường (kể cả phần tử của list/dict) được phân giải một lần
+    khi biên dịch, nên lúc chạy không còn dò openapi_types hay typing_utils.
+
+    :param klass: class literal or typing generic.
+    :return: deserializer function, cached per klass.
+    """
+    deserializer = _deserializers.get(klass)
+    if deserializer is None:
+        deserializer = _deserializers[klass] = _compile(klass)
+    return deserializer
+
+
+def _compile(klass):
+    if klass in (int, float, str, bool):
+        def deserialize_primitive(data):
+            # Đúng kiểu rồi thì klass(data) cũng chỉ trả lại chính data
+            if data is None or type(data) is klass:
+                return data
+            return _deserialize_primitive(data, klass)
+        return deserialize_primitive
+    if klass == bytearray:
+        return lambda data: None if data is None else _deserialize_primitive(data, klass)
+    if klass == object:
+        return _deserialize_object
+    if klass == datetime.date:
+        return deserialize_date
+    if klass == datetime.datetime:
+        return deserialize_datetime
+    if typing_utils.is_generic(klass):
         if typing_utils.is_list(klass):
-            return _deserialize_list(data, klass.__args__[0])
+            element = compile_deserializer(klass.__args__[0])
+
+            def deserialize_list(data):
+                if data is None:
+                    return None
+                return [element(sub_data) for sub_data in data]
+            return deserialize_list
         if typing_utils.is_dict(klass):
-            return _deserialize_dict(data, klass.__args__[1])
-    else:
-        return deserialize_model(data, klass)
+            element = compile_deserializer(klass.__args__[1])
+
+            def deserialize_dict(data):
+                if data is None:
+                    return None
+                return {k: element(v) for k, v in data.items()}
+            return deserialize_dict
+        return lambda data: None
+    return _compile_model(klass)
+
+
+def _compile_model(klass):
+    template = klass()
+    if not template.openapi_types:
+        return _deserialize_object
+
+    # Trường lồng nhau được biên dịch ở lần gọi đầu tiên (model có thể tham chiếu chính nó)
+    fields = [(attr, template.attribute_map[attr], attr_type)
+              for attr, attr_type in template.openapi_types.items()]
+    plan = None
+
+    def deserialize_model_fields(data):
+        nonlocal plan
+        if data is None:
+            return None
+        if plan is None:
+            plan = [(attr, key, compile_deserializer(attr_type)) for attr, key, attr_type in fields]
+        instance = klass()
+        if isinstance(data, (list, dict)):
+            for attr, key, deserialize in plan:
+                if key in data:
+                    setattr(instance, attr, deserialize(data[key]))
+        return instance
+    return deserialize_model_fields
 
 
 def _deserialize_primitive(data, klass):
@@ -104,44 +168,9 @@ def deserialize_model(data, klass):
     :param klass: class literal.
     :return: model object.
     """
-    instance = klass()
-
-    if not instance.openapi_types:
-        return data
-
-    for attr, attr_type in instance.openapi_types.items():
-        if data is not None \
-                and instance.attribute_map[attr] in data \
-                and isinstance(data, (list, dict)):
-            value = data[instance.attribute_map[attr]]
-            setattr(instance, attr, _deserialize(value, attr_type))
-
-    return instance
-
-
-def _deserialize_list(data, boxed_type):
-    """Deserializes a list and its elements.
-
-    :param data: list to deserialize.
-    :type data: list
-    :param boxed_type: class literal.
-
-    :return: deserialized list.
-    :rtype: list
-    """
-    return [_deserialize(sub_data, boxed_type)
-            for sub_data in data]
-
-
-def _deserialize_dict(data, boxed_type):
-    """Deserializes a dict and its elements.
-
-    :param data: dict to deserialize.
-    :type data: dict
-    :param boxed_type: class literal.
+    if data is None:
+        # Giữ nguyên hành vi cũ: trả về một instance rỗng
+        instance = klass()
+        return instance if instance.openapi_types else data
+    return compile_deserializer(klass)(data)
 
-    :return: deserialized dict.
-    :rtype: dict
-    """
-    return {k: _deserialize(v, boxed_type)
-            for k, v in data.items() }
@@ -0,0 +1,260 @@
+"""
+Validate request body bằng hàm Python sinh sẵn từ schema OpenAPI.
+
+connexion validate mọi requestBody qua jsonschema (Draft4RequestValidator): mỗi request
+phải duyệt lại schema, tra bảng VALIDATORS và sinh generator lỗi cho từng keyword.
+Ở đây mỗi schema được biên dịch MỘT lần (lúc add_api) thành một hàm kiểm tra phẳng,
+chỉ trả lời "hợp lệ hay không". Khi dữ liệu không qua được hàm này, request đi tiếp
+qua validator jsonschema gốc để lấy đúng thông báo lỗi như trước, nên client không
+thấy khác biệt nào ngoài thời gian xử lý.
+
+Hàm sinh ra chỉ được phép "chặt hơn" jsonschema: nó có thể từ chối dữ liệu hợp lệ
+(khi đó jsonschema quyết định) nhưng không bao giờ nhận dữ liệu sai. Schema dùng
+keyword chưa hỗ trợ thì không biên dịch, request đi thẳng đường jsonschema.
+"""
+import logging
+import threading
+
+from connexion.decorators.validation import RequestBodyValidator
+
+logger = logging.getLogger(__name__)
+
+# Keyword chỉ mang tính mô tả, không ảnh hưởng kết quả validate. connexion gắn kèm
+# 'components' vào schema body để resolve $ref (các $ref trong body đã được resolve sẵn)
+_ANNOTATIONS = frozenset({
+    'title', 'description', 'example', 'examples', 'default', 'deprecated',
+    'externalDocs', 'xml', 'discriminator', 'writeOnly', 'components', 'definitions',
+})
+
+# Kiểm tra kiểu: chỉ chấp nhận đúng các kiểu json.loads trả về (bool không phải số)
+_TYPE_CHECKS = {
+    'object': 'type({v}) is dict',
+    'array': 'type({v}) is list',
+    'string': 'type({v}) is str',
+    'integer': 'type({v}) is int',
+    'number': 'type({v}) in _NUMBER',
+    'boolean': 'type({v}) is bool',
+}
+
+
+class Unsupported(Exception):
+    """Schema có keyword mà bộ biên dịch không xử lý"""
+
+
+class _Compiler:
+
+    def __init__(self, format_checker):
+        self.format_checker = format_checker
+        self.lines = []
+        self.constants = {}
+        self._names = 0
+
+    def name(self, prefix):
+        self._names += 1
+        return f'{prefix}{self._names}'
+
+    def constant(self, value):
+        key = self.name('_k')
+        self.constants[key] = value
+        return key
+
+    def emit(self, depth, line):
+        self.lines.append('    ' * depth + line)
+
+    def schema(self, schema, v, depth):
+        """Sinh lệnh kiểm tra biến `v` theo `schema`; sai thì `return False`"""
+        if not isinstance(schema, dict):
+            raise Unsupported(repr(schema))
+        for key in schema:
+            if key not in _HANDLED and key not in _ANNOTATIONS and not key.startswith('x-'):
+                raise Unsupported(key)
+        if schema.get('readOnly'):
+            raise Unsupported('readOnly')
+
+        nullable = schema.get('nullable') or schema.get('x-nullable') is True
+        kind = schema.get('type')
+        if kind is not None:
+            if kind not in _TYPE_CHECKS:
+                raise Unsupported(f'type {kind!r}')
+            check = _TYPE_CHECKS[kind].format(v=v)
+            if nullable:
+                check = f'{v} is None or {check}'
+            self.emit(depth, f'if not ({check}): return False')
+        # Sau khi kiểm tra type (không nullable) thì các keyword cùng loại không cần guard
+        known = kind if kind is not None and not nullable else None
+
+        if 'enum' in schema:
+            values = schema['enum']
+            # Chỉ so sánh chuỗi: tránh khác biệt 1 == True giữa Python và jsonschema
+            if not values or not all(type(value) is str for value in values):
+                raise Unsupported('enum')
+            check = f'{v} in {self.constant(frozenset(values))}'
+            if known != 'string':
+                check = f'type({v}) is str and {check}'
+            if nullable:
+                check = f'{v} is None or {check}'
+            self.emit(depth, f'if not ({check}): return False')
+
+        if 'format' in schema and self.format_checker is not None \
+                and schema['format'] in self.format_checker.checkers:
+            checker = self.constant(self.format_checker)
+            fmt = self.constant(schema['format'])
+            self.emit(depth, f'if not {checker}.conforms({v}, {fmt}): return False')
+
+        for sub in schema.get('allOf', ()):
+            self.schema(sub, v, depth)
+
+        self.numeric(schema, v, depth, known)
+        self.string(schema, v, depth, known)
+        self.array(schema, v, depth, known)
+        self.object(schema, v, depth, known)
+
+    def guarded(self, v, depth, known, kind):
+        """Mở khối `if type(v) ...` khi chưa chắc kiểu của v; trả về độ sâu bên trong"""
+        if known == kind:
+            return depth
+        self.emit(depth, f'if {_TYPE_CHECKS[kind].format(v=v)}:')
+        return depth + 1
+
+    def numeric(self, schema, v, depth, known):
+        if 'minimum' not in schema and 'maximum' not in schema:
+            return
+        if known != 'integer':
+            depth = self.guarded(v, depth, known, 'number')
+        if 'minimum' in schema:
+            op = '<=' if schema.get('exclusiveMinimum') else '<'
+            self.emit(depth, f'if {v} {op} {self.constant(schema["minimum"])}: return False')
+        if 'maximum' in schema:
+            op = '>=' if schema.get('exclusiveMaximum') else '>'
+            self.emit(depth, f'if {v} {op} {self.constant(schema["maximum"])}: return False')
+
+    def string(self, schema, v, depth, known):
+        if 'minLength' not in schema and 'maxLength' not in schema:
+            return
+        depth = self.guarded(v, depth, known, 'string')
+        if 'minLength' in schema:
+            self.emit(depth, f'if len({v}) < {int(schema["minLength"])}: return False')
+        if 'maxLength' in schema:
+            self.emit(depth, f'if len({v}) > {int(schema["maxLength"])}: return False')
+
+    def array(self, schema, v, depth, known):
+        items = schema.get('items')
+        if items is None and 'minItems' not in schema and 'maxItems' not in schema:
+            return
+        depth = self.guarded(v, depth, known, 'array')
+        if 'minItems' in schema:
+            self.emit(depth, f'if len({v}) < {int(schema["minItems"])}: return False')
+        if 'maxItems' in schema:
+            self.emit(depth, f'if len({v}) > {int(schema["maxItems"])}: return False')
+        if items is not None:
+            if not isinstance(items, dict):
+                raise Unsupported('items (tuple)')
+            item = self.name('v')
+            self.emit(depth, f'for {item} in {v}:')
+            self.schema(items, item, depth + 1)
+
+    def object(self, schema, v, depth, known):
+        properties = schema.get('properties') or {}
+        required = schema.get('required') or []
+        extra = schema.get('additionalProperties', True)
+        if extra == {}:
+            extra = True
+        if not properties and not required and extra is True:
+            return
+        depth = self.guarded(v, depth, known, 'object')
+        for prop in required:
+            self.emit(depth, f'if {self.constant(prop)} not in {v}: return False')
+        if extra is False:
+            allowed = self.constant(frozenset(properties))
+            self.emit(depth, f'if not {allowed}.issuperset({v}): return False')
+        elif isinstance(extra, dict):
+            # Thuộc tính ngoài `properties` phải khớp schema additionalProperties
+            allowed = self.constant(frozenset(properties))
+            key, value = self.name('k'), self.name('v')
+            self.emit(depth, f'for {key}, {value} in {v}.items():')
+            self.emit(depth + 1, f'if {key} in {allowed}: continue')
+            self.schema(extra, value, depth + 1)
+        elif extra is not True:
+            raise Unsupported('additionalProperties')
+        for prop, subschema in properties.items():
+            value = self.name('v')
+            mark = len(self.lines)
+            self.emit(depth, f'{value} = {v}.get({self.constant(prop)}, _MISSING)')
+            self.emit(depth, f'if {value} is not _MISSING:')
+            body = len(self.lines)
+            self.schema(subschema, value, depth + 1)
+            if len(self.lines) == body:
+                del self.lines[mark:]  # Thuộc tính không ràng buộc gì
+
+    @staticmethod
+    def _prune(lines):
+        """Bỏ các khối `if ...:`/`for ...:` không có thân (guard mở ra nhưng không có ràng buộc)"""
+        kept = []
+        for line in reversed(lines):
+            if line.endswith(':'):
+                indent = len(line) - len(line.lstrip())
+                if not kept or len(kept[-1]) - len(kept[-1].lstrip()) <= indent:
+                    continue
+            kept.append(line)
+        return kept[::-1]
+
+    def build(self, schema):
+        self.schema(schema, 'v0', 1)
+        body = self._prune(self.lines) + ['    return True']
+        source = 'def check(v0):\n' + '\n'.join(body) + '\n'
+        namespace = dict(self.constants, _NUMBER=(int, float), _MISSING=object())
+        exec(compile(source, '<compiled request schema>', 'exec'), namespace)
+        check = namespace['check']
+        check.source = source
+        return check
+
+
+_HANDLED = frozenset({
+    'type', 'nullable', 'enum', 'format', 'allOf', 'readOnly',
+    'minimum', 'maximum', 'exclusiveMinimum', 'exclusiveMaximum',
+    'minLength', 'maxLength', 'items', 'minItems', 'maxItems',
+    'properties', 'required', 'additionalProperties',
+})
+
+_compiled = {}  # id(schema) -> (schema, check): giữ tham chiếu để id không bị tái sử dụng
+_lock = threading.Lock()
+
+
+def compile_schema(schema, format_checker=None):
+    """
+    Hàm check(data) -> bool cho `schema` (đã resolve $ref), None nếu schema dùng keyword
+    chưa hỗ trợ. False chỉ có nghĩa "cần hỏi lại jsonschema", không phải chắc chắn sai.
+    Kết quả được cache theo object schema.
+    """
+    cached = _compiled.get(id(schema))
+    if cached is not None and cached[0] is schema:
+        return cached[1]
+    with _lock:
+        cached = _compiled.get(id(schema))
+        if cached is not None and cached[0] is schema:
+            return cached[1]
+        try:
+            check = _Compiler(format_checker).build(schema)
+        except Unsupported as e:
+            logger.info(f"Request schema not compiled ({e}), using jsonschema validation")
+            check = None
+        _compiled[id(schema)] = (schema, check)
+        return check
+
+
+class CompiledRequestBodyValidator(RequestBodyValidator):
+    """
+    RequestBodyValidator của connexion, biên dịch schema lúc khởi tạo operation.
+    Dữ liệu hợp lệ chỉ đi qua hàm đã biên dịch; dữ liệu sai (hoặc schema không biên
+    dịch được) đi qua validator jsonschema gốc để giữ nguyên thông báo lỗi 400.
+    Dùng: app.add_api(..., validator_map={'body': CompiledRequestBodyValidator})
+    """
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.check = compile_schema(self.schema, self.validator.format_checker)
+
+    def validate_schema(self, data, url):
+        if self.check is not None and self.check(data):
+            return None
+        return super().validate_schema(data, url)